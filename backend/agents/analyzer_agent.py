@@ -1,26 +1,40 @@
 from typing import List, Dict, Any
 from agents.base_agent import BaseAgent
+from config import settings
+from context import pack_findings
 from models import SubtaskResult, LegalFinding
+from scheduler import StageScheduler
+from validators import bullet_list, field, score_range, text_length
 
 class AnalyzerAgent(BaseAgent):
+    validators = [
+        field("analysis", text_length()),
+        field("precedent_strength", score_range()),
+        field("confidence_score", score_range())
+    ]
+    
     def __init__(self):
         super().__init__("Analyzer")
     
     async def execute(self, input_data: List[LegalFinding]) -> SubtaskResult:
         try:
-            analysis = await self._analyze_findings(input_data)
-            
-            key_patterns = await self._identify_patterns(input_data)
+            scheduler = StageScheduler()
+            scheduler.add("analysis", lambda: self.run_step(
+                "analyze_findings", lambda: self._analyze_findings(input_data), text_length(20)
+            ))
+            scheduler.add("key_patterns", lambda: self.run_step(
+                "identify_patterns", lambda: self._identify_patterns(input_data), bullet_list(max_items=10)
+            ))
+            scheduler.add("jurisdictional_analysis", lambda: self._analyze_jurisdictions(input_data))
+            scheduler.add("precedent_strength", lambda: self._evaluate_precedent_strength(input_data))
             
-            jurisdictional_analysis = await self._analyze_jurisdictions(input_data)
-            
-            precedent_strength = await self._evaluate_precedent_strength(input_data)
+            results = await scheduler.run()
             
             result_data = {
-                "analysis": analysis,
-                "key_patterns": key_patterns,
-                "jurisdictional_analysis": jurisdictional_analysis,
-                "precedent_strength": precedent_strength,
+                "analysis": results["analysis"],
+                "key_patterns": results["key_patterns"],
+                "jurisdictional_analysis": results["jurisdictional_analysis"],
+                "precedent_strength": results["precedent_strength"],
                 "confidence_score": self._calculate_confidence_score(input_data)
             }
             
@@ -36,11 +50,12 @@ class AnalyzerAgent(BaseAgent):
                 task_type="analysis",
                 success=False,
                 data=None,
-                processing_time=0
+                processing_time=0,
+                error=self.format_error(e)
             )
     
     async def _analyze_findings(self, findings: List[LegalFinding]) -> str:
-        content = "\n".join([f.content for f in findings])
+        content = pack_findings(findings, settings.context_findings_tokens)
         
         analysis_prompt = f"""
         Analyze these legal findings for common themes and legal principles:
@@ -56,10 +71,10 @@ class AnalyzerAgent(BaseAgent):
         Keep the analysis concise but thorough.
         """
         
-        return await self.llm.apredict(analysis_prompt)
+        return await self.predict(analysis_prompt, step="analyze_findings")
     
     async def _identify_patterns(self, findings: List[LegalFinding]) -> List[str]:
-        content = "\n".join([f.content for f in findings])
+        content = pack_findings(findings, settings.context_findings_tokens)
         
         pattern_prompt = f"""
         Identify key legal patterns and recurring themes in these findings:
@@ -69,7 +84,7 @@ class AnalyzerAgent(BaseAgent):
         Return a list of 3-5 key patterns as bullet points.
         """
         
-        response = await self.llm.apredict(pattern_prompt)
+        response = await self.predict(pattern_prompt, step="identify_patterns")
         return [line.strip("- ").strip() for line in response.split("\n") if line.strip().startswith("-")]
     
     async def _analyze_jurisdictions(self, findings: List[LegalFinding]) -> Dict[str, str]:
@@ -81,7 +96,7 @@ class AnalyzerAgent(BaseAgent):
                     jurisdictions[citation.jurisdiction] = []
                 jurisdictions[citation.jurisdiction].append(citation.case_name)
         
-        analysis = {}
+        scheduler = StageScheduler()
         for jurisdiction, cases in jurisdictions.items():
             jurisdiction_prompt = f"""
             Analyze the legal position in {jurisdiction} based on these cases:
@@ -90,9 +105,11 @@ class AnalyzerAgent(BaseAgent):
             Provide a brief summary of the jurisdiction's stance.
             """
             
-            analysis[jurisdiction] = await self.llm.apredict(jurisdiction_prompt)
+            scheduler.add(jurisdiction, lambda prompt=jurisdiction_prompt: self.run_step(
+                "jurisdiction_analysis", lambda: self.predict(prompt, step="jurisdiction_analysis"), text_length(20)
+            ))
         
-        return analysis
+        return await scheduler.run()
     
     async def _evaluate_precedent_strength(self, findings: List[LegalFinding]) -> float:
         authority_scores = [f.authority_score for f in findings]
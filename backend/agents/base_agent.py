@@ -1,58 +1,80 @@
 import asyncio
+import random
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
-from langchain.llms import OpenAI
-from langchain.chat_models import ChatOpenAI
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 from config import settings
+from llm import llm
 from models import SubtaskResult
+from cache import llm_cache, prompt_cache_key
+from llm_governor import llm_governor
+from metrics import record_agent_result, record_judge_verdict, record_llm_cache, record_llm_call, record_step_retry
+from validators import Check, ValidationError, run_checks
+
+T = TypeVar("T")
+
+step_attempt: ContextVar[int] = ContextVar("agent_step_attempt", default=0)
+step_retries: ContextVar[Optional[List[int]]] = ContextVar("agent_step_retries", default=None)
 
 class BaseAgent(ABC):
+    validators: List[Check] = []
+    
     def __init__(self, name: str):
         self.name = name
-        self.llm = ChatOpenAI(
-            openai_api_key=settings.openai_api_key,
-            model_name="gpt-4",
-            temperature=0.1
-        )
-        self.max_retries = 3
+        self.llm = llm
     
     @abstractmethod
     async def execute(self, input_data: Any) -> SubtaskResult:
         pass
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
     async def execute_with_retry(self, input_data: Any) -> SubtaskResult:
         start_time = time.time()
-        retry_count = 0
+        retries = [0]
+        token = step_retries.set(retries)
         
         try:
             result = await self.execute(input_data)
-            processing_time = time.time() - start_time
-            
-            result.processing_time = processing_time
-            result.retry_count = retry_count
+        finally:
+            step_retries.reset(token)
+        
+        if result.success:
+            problems = run_checks(result.data, self.validators)
+            if problems:
+                result.success = False
+                result.error = self.format_error(ValidationError(self.name, problems))
+            elif random.random() < settings.llm_judge_sample_rate:
+                record_judge_verdict(self.name, await self.self_evaluate(input_data, result))
+        
+        result.processing_time = time.time() - start_time
+        result.retry_count = retries[0]
+        record_agent_result(self.name, result.processing_time, result.retry_count, result.success, result.error)
+        return result
+    
+    async def run_step(self, step: str, func: Callable[[], Awaitable[T]], *checks: Check) -> T:
+        error: Exception = ValidationError(step, ["no attempts made"])
+        
+        for attempt in range(settings.agent_step_retries + 1):
+            if attempt:
+                retries = step_retries.get()
+                if retries is not None:
+                    retries[0] += 1
+                record_step_retry(self.name, step, type(error).__name__)
+                await asyncio.sleep(random.uniform(0, settings.agent_step_backoff * 2 ** (attempt - 1)))
             
-            if await self.self_evaluate(input_data, result):
-                return result
-            else:
-                raise Exception("Self-evaluation failed")
-                
-        except Exception as e:
-            retry_count += 1
-            if retry_count >= self.max_retries:
-                return SubtaskResult(
-                    task_type=self.name,
-                    success=False,
-                    data=None,
-                    processing_time=time.time() - start_time,
-                    retry_count=retry_count
-                )
-            raise
+            token = step_attempt.set(attempt)
+            try:
+                value = await func()
+                problems = run_checks(value, checks)
+                if not problems:
+                    return value
+                error = ValidationError(step, problems)
+            except Exception as e:
+                error = e
+            finally:
+                step_attempt.reset(token)
+        
+        raise error
     
     async def self_evaluate(self, input_data: Any, result: SubtaskResult) -> bool:
         if not result.success:
@@ -69,10 +91,74 @@ class BaseAgent(ABC):
         """
         
         try:
-            response = await self.llm.apredict(evaluation_prompt)
+            response = await self.predict(evaluation_prompt, step="self_evaluate")
             return "PASS" in response.upper()
         except Exception:
             return True
     
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        if not settings.llm_cache_enabled:
+            return None
+        model = settings.llm_model if settings.llm_provider == "openai" else settings.llm_provider
+        return prompt_cache_key(model, settings.llm_temperature, prompt)
+    
+    async def _cached(self, cache_key: Optional[str]) -> Optional[str]:
+        if not cache_key or step_attempt.get() > 0:
+            return None
+        
+        cached = await llm_cache.aget(cache_key)
+        record_llm_cache(self.name, cached is not None)
+        return cached
+    
+    async def _call_llm(self, prompt: str, step: str, call: Callable[[], Awaitable[str]]) -> str:
+        start_time = time.perf_counter()
+        
+        try:
+            response, prompt_tokens, completion_tokens = await llm_governor.run(prompt, call)
+        except Exception as e:
+            record_llm_call(self.name, step, time.perf_counter() - start_time, 0, 0, error=e)
+            raise
+        
+        record_llm_call(self.name, step, time.perf_counter() - start_time, prompt_tokens, completion_tokens)
+        return response
+    
+    async def predict(self, prompt: str, step: str = "predict") -> str:
+        cache_key = self._cache_key(prompt)
+        cached = await self._cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        model = await self.llm.aresolve()
+        response = await self._call_llm(prompt, step, lambda: model.apredict(prompt))
+        
+        if cache_key:
+            await llm_cache.aset(cache_key, response)
+        
+        return response
+    
+    async def stream_predict(self, prompt: str, on_token: Callable[[str], None], step: str = "predict") -> str:
+        cache_key = self._cache_key(prompt)
+        cached = await self._cached(cache_key)
+        if cached is not None:
+            on_token(cached)
+            return cached
+        
+        model = await self.llm.aresolve()
+        
+        async def stream() -> str:
+            chunks = []
+            async for chunk in model.astream(prompt):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    on_token(chunk.content)
+            return "".join(chunks)
+        
+        response = await self._call_llm(prompt, step, stream)
+        
+        if cache_key:
+            await llm_cache.aset(cache_key, response)
+        
+        return response
+    
     def format_error(self, error: Exception) -> str:
         return f"{self.name} Error: {str(error)}" 
\ No newline at end of file
@@ -1,9 +1,14 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 from datetime import datetime
 from agents.base_agent import BaseAgent
+from config import settings
+from context import compress, pack_findings, pack_list
 from models import SubtaskResult, LegalBrief, LegalFinding, Citation
+from validators import field, mentions_any, text_length
 
 class ComposerAgent(BaseAgent):
+    validators = [field("formatted_brief", text_length(settings.brief_min_chars))]
+    
     def __init__(self):
         super().__init__("Composer")
     
@@ -16,9 +21,11 @@ class ComposerAgent(BaseAgent):
             
             supporting_cases = self._extract_supporting_cases(findings)
             
-            legal_analysis = await self._compose_legal_analysis(
-                query, findings, analysis
-            )
+            legal_analysis = input_data.get("legal_analysis")
+            if not legal_analysis:
+                legal_analysis = await self.compose_legal_analysis(
+                    query, findings, analysis
+                )
             
             jurisdiction_analysis = analysis.get("jurisdictional_analysis", {})
             
@@ -33,7 +40,9 @@ class ComposerAgent(BaseAgent):
                 generated_at=datetime.now()
             )
             
-            formatted_brief = await self._format_brief(brief)
+            formatted_brief = await self._format_brief(
+                brief, input_data.get("on_token"), input_data.get("on_token_reset")
+            )
             
             return SubtaskResult(
                 task_type="composition",
@@ -50,7 +59,8 @@ class ComposerAgent(BaseAgent):
                 task_type="composition",
                 success=False,
                 data=None,
-                processing_time=0
+                processing_time=0,
+                error=self.format_error(e)
             )
     
     def _extract_supporting_cases(self, findings: List[LegalFinding]) -> List[Citation]:
@@ -63,10 +73,10 @@ class ComposerAgent(BaseAgent):
         
         return citations[:10]
     
-    async def _compose_legal_analysis(self, query: str, findings: List[LegalFinding], analysis: Dict[str, Any]) -> str:
-        findings_text = "\n".join([f.content for f in findings])
-        analysis_text = analysis.get("analysis", "")
-        patterns = analysis.get("key_patterns", [])
+    async def compose_legal_analysis(self, query: str, findings: List[LegalFinding], analysis: Dict[str, Any]) -> str:
+        findings_text = pack_findings(findings, settings.context_findings_tokens)
+        analysis_text = compress(analysis.get("analysis", ""), settings.context_analysis_tokens)
+        patterns = pack_list(analysis.get("key_patterns", []), settings.context_patterns_tokens)
         
         composition_prompt = f"""
         Compose a comprehensive legal analysis for the query: "{query}"
@@ -87,17 +97,26 @@ class ComposerAgent(BaseAgent):
         Include specific case references where applicable.
         """
         
-        return await self.llm.apredict(composition_prompt)
+        return await self.run_step(
+            "legal_analysis",
+            lambda: self.predict(composition_prompt, step="legal_analysis"),
+            text_length(settings.summary_min_chars)
+        )
     
-    async def _format_brief(self, brief: LegalBrief) -> str:
+    async def _format_brief(
+        self,
+        brief: LegalBrief,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_token_reset: Optional[Callable[[], None]] = None
+    ) -> str:
         formatted_prompt = f"""
         Format this legal brief into a professional document structure:
         
         Query: {brief.query}
-        Executive Summary: {brief.executive_summary}
-        Key Findings: {brief.key_findings}
-        Legal Analysis: {brief.legal_analysis}
-        Conclusions: {brief.conclusions}
+        Executive Summary: {compress(brief.executive_summary, settings.context_brief_section_tokens)}
+        Key Findings: {pack_list(brief.key_findings, settings.context_brief_section_tokens)}
+        Legal Analysis: {compress(brief.legal_analysis, settings.context_brief_section_tokens)}
+        Conclusions: {pack_list(brief.conclusions, settings.context_brief_section_tokens)}
         Supporting Cases: {[c.case_name for c in brief.supporting_cases]}
         
         Create a well-structured legal brief with:
@@ -109,6 +128,24 @@ class ComposerAgent(BaseAgent):
         Return the formatted brief as a string.
         """
         
-        return await self.llm.apredict(formatted_prompt)
+        checks = (
+            text_length(settings.brief_min_chars),
+            mentions_any([c.case_name for c in brief.supporting_cases])
+        )
+        
+        if not on_token:
+            return await self.run_step("format_brief", lambda: self.predict(formatted_prompt, step="format_brief"), *checks)
+        
+        attempts = 0
+        
+        async def stream() -> str:
+            nonlocal attempts
+            # A retry streams a fresh brief, so the client drops the tokens it already received.
+            if attempts and on_token_reset:
+                on_token_reset()
+            attempts += 1
+            return await self.stream_predict(formatted_prompt, on_token, step="format_brief")
+        
+        return await self.run_step("format_brief", stream, *checks)
 
 composer_agent = ComposerAgent() 
\ No newline at end of file
@@ -1,11 +1,23 @@
 import asyncio
+import logging
+import re
 from typing import List, Dict, Any
 from agents.base_agent import BaseAgent
+from config import settings
 from models import SubtaskResult, LegalQuery, LegalFinding, Citation
 from legal_apis import legal_api_manager
 from vector_store import vector_store
+from reranker import LLMReranker, cross_encoder_reranker
+from validators import database_findings_cited, findings_have_content
+
+logger = logging.getLogger(__name__)
+
+def _words(text: str) -> str:
+    return f" {' '.join(re.findall(r'[a-z0-9]+', text.lower()))} "
 
 class RetrieverAgent(BaseAgent):
+    validators = [findings_have_content, database_findings_cited]
+    
     def __init__(self):
         super().__init__("Retriever")
     
@@ -16,7 +28,11 @@ class RetrieverAgent(BaseAgent):
                 input_data.jurisdiction
             )
             
-            vector_results = vector_store.search(input_data.query, k=10)
+            store = await vector_store.aresolve()
+            vector_results = await self.run_step(
+                "vector_search",
+                lambda: store.asearch(input_data.query, k=10, filters=input_data.search_filters())
+            )
             
             findings = []
             
@@ -31,7 +47,7 @@ class RetrieverAgent(BaseAgent):
                 findings.append(finding)
             
             for result in vector_results[:5]:
-                if result["score"] > 0.7:
+                if self._is_relevant(result, input_data.query):
                     finding = LegalFinding(
                         content=result["content"],
                         source="Vector Store",
@@ -55,9 +71,20 @@ class RetrieverAgent(BaseAgent):
                 task_type="retrieval",
                 success=False,
                 data=None,
-                processing_time=0
+                processing_time=0,
+                error=self.format_error(e)
             )
     
+    def _is_relevant(self, result: Dict[str, Any], query: str) -> bool:
+        dense_score = result["dense_score"] if "dense_score" in result else result["score"]
+        if dense_score is not None and dense_score > settings.vector_score_threshold:
+            return True
+        return result.get("lexical_score") is not None and self._matches_phrase(result["content"], query)
+    
+    def _matches_phrase(self, content: str, query: str) -> bool:
+        phrase = _words(query)
+        return bool(phrase.strip()) and phrase in _words(content)
+    
     def _calculate_authority_score(self, citation: Citation) -> float:
         authority_map = {
             "Supreme Court": 1.0,
@@ -73,21 +100,33 @@ class RetrieverAgent(BaseAgent):
         return 0.6
     
     async def _enhance_findings(self, findings: List[LegalFinding], query: str) -> List[LegalFinding]:
-        enhancement_prompt = f"""
-        Given the legal query: "{query}"
-        
-        Rank these findings by relevance and legal authority:
-        {[f.content[:200] for f in findings]}
+        if settings.reranker_backend == "none" or len(findings) <= 1:
+            return findings[:settings.reranker_top_k]
         
-        Return only the indices of the top 5 most relevant findings.
-        Format: [0, 1, 2, 3, 4]
-        """
+        passages = [self._finding_text(f) for f in findings]
         
         try:
-            response = await self.llm.apredict(enhancement_prompt)
-            indices = eval(response.strip())
-            return [findings[i] for i in indices if i < len(findings)]
-        except Exception:
-            return findings[:5]
+            if settings.reranker_backend == "llm":
+                ranking = await LLMReranker(lambda prompt: self.predict(prompt, step="rerank")).arank(query, passages)
+            else:
+                reranker = await cross_encoder_reranker.aresolve()
+                ranking = await reranker.arank(query, passages)
+        except Exception as e:
+            logger.warning(f"Reranking failed, keeping retrieval order: {str(e)}")
+            return findings[:settings.reranker_top_k]
+        
+        reranked = []
+        for i, score in ranking:
+            finding = findings[i]
+            if settings.reranker_backend != "llm":
+                finding.relevance_score = score
+            reranked.append(finding)
+        return reranked
+    
+    def _finding_text(self, finding: LegalFinding) -> str:
+        parts = [finding.content]
+        for citation in finding.citations:
+            parts.append(f"{citation.case_name}, {citation.citation} ({citation.court}, {citation.date.year})")
+        return "\n".join(parts)
 
 retriever_agent = RetrieverAgent() 
\ No newline at end of file
@@ -1,6 +1,10 @@
 from typing import List, Dict, Any
 from agents.base_agent import BaseAgent
+from config import settings
+from context import compress, pack_findings, pack_list
 from models import SubtaskResult, LegalFinding
+from scheduler import StageScheduler
+from validators import bullet_list, text_length
 
 class SummarizerAgent(BaseAgent):
     def __init__(self):
@@ -12,16 +16,25 @@ class SummarizerAgent(BaseAgent):
             analysis = input_data.get("analysis", {})
             query = input_data.get("query", "")
             
-            executive_summary = await self._create_executive_summary(query, findings, analysis)
+            scheduler = StageScheduler()
+            scheduler.add("executive_summary", lambda: self.run_step(
+                "executive_summary",
+                lambda: self._create_executive_summary(query, findings, analysis),
+                text_length(settings.summary_min_chars, settings.summary_max_chars)
+            ))
+            scheduler.add("key_findings", lambda: self.run_step(
+                "key_findings", lambda: self._extract_key_findings(findings, analysis), bullet_list(max_items=15)
+            ))
+            scheduler.add("conclusions", lambda: self.run_step(
+                "conclusions", lambda: self._generate_conclusions(findings, analysis), bullet_list(max_items=10)
+            ))
             
-            key_findings = await self._extract_key_findings(findings, analysis)
-            
-            conclusions = await self._generate_conclusions(findings, analysis)
+            results = await scheduler.run()
             
             result_data = {
-                "executive_summary": executive_summary,
-                "key_findings": key_findings,
-                "conclusions": conclusions
+                "executive_summary": results["executive_summary"],
+                "key_findings": results["key_findings"],
+                "conclusions": results["conclusions"]
             }
             
             return SubtaskResult(
@@ -36,12 +49,13 @@ class SummarizerAgent(BaseAgent):
                 task_type="summarization",
                 success=False,
                 data=None,
-                processing_time=0
+                processing_time=0,
+                error=self.format_error(e)
             )
     
     async def _create_executive_summary(self, query: str, findings: List[LegalFinding], analysis: Dict[str, Any]) -> str:
-        findings_text = "\n".join([f.content[:300] for f in findings[:5]])
-        analysis_text = analysis.get("analysis", "")
+        findings_text = pack_findings(findings, settings.context_summary_findings_tokens)
+        analysis_text = compress(analysis.get("analysis", ""), settings.context_analysis_tokens)
         
         summary_prompt = f"""
         Create a concise executive summary for this legal research query: "{query}"
@@ -60,11 +74,11 @@ class SummarizerAgent(BaseAgent):
         Write in professional legal language suitable for attorneys.
         """
         
-        return await self.llm.apredict(summary_prompt)
+        return await self.predict(summary_prompt, step="executive_summary")
     
     async def _extract_key_findings(self, findings: List[LegalFinding], analysis: Dict[str, Any]) -> List[str]:
-        findings_text = "\n".join([f.content for f in findings])
-        patterns = analysis.get("key_patterns", [])
+        findings_text = pack_findings(findings, settings.context_findings_tokens)
+        patterns = pack_list(analysis.get("key_patterns", []), settings.context_patterns_tokens)
         
         key_findings_prompt = f"""
         Extract 5-7 key legal findings from this research:
@@ -76,7 +90,7 @@ class SummarizerAgent(BaseAgent):
         Each finding should be specific and cite-able.
         """
         
-        response = await self.llm.apredict(key_findings_prompt)
+        response = await self.predict(key_findings_prompt, step="key_findings")
         return [line.strip("- ").strip() for line in response.split("\n") if line.strip().startswith("-")]
     
     async def _generate_conclusions(self, findings: List[LegalFinding], analysis: Dict[str, Any]) -> List[str]:
@@ -87,13 +101,13 @@ class SummarizerAgent(BaseAgent):
         Generate practical legal conclusions based on:
         - Precedent strength: {precedent_strength}
         - Confidence score: {confidence_score}
-        - Analysis: {analysis.get("analysis", "")}
+        - Analysis: {compress(analysis.get("analysis", ""), settings.context_analysis_tokens)}
         
         Provide 3-5 actionable conclusions for legal practitioners.
         Include confidence levels and practical recommendations.
         """
         
-        response = await self.llm.apredict(conclusions_prompt)
+        response = await self.predict(conclusions_prompt, step="conclusions")
         return [line.strip("- ").strip() for line in response.split("\n") if line.strip().startswith("-")]
 
 summarizer_agent = SummarizerAgent() 
\ No newline at end of file
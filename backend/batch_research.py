@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from fastapi.encoders import jsonable_encoder
+from config import settings
+from coalescing import query_key
+from legal_apis import legal_api_manager
+from llm_governor import request_priority
+from models import AgentResponse, LegalQuery
+from orchestrator import orchestrator
+from vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+def parse_queries(text: str) -> List[Union[LegalQuery, str]]:
+    stripped = text.strip()
+    if stripped.startswith("["):
+        records = json.loads(stripped)
+    else:
+        records = []
+        for number, line in enumerate(stripped.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(f"line {number}: invalid JSON ({e.msg})")
+
+    queries: List[Union[LegalQuery, str]] = []
+    for record in records:
+        if isinstance(record, str):
+            queries.append(record)
+            continue
+        try:
+            queries.append(LegalQuery(**record))
+        except Exception as e:
+            queries.append(f"invalid query: {str(e)}")
+    return queries
+
+async def _prefetch_embeddings(queries: List[LegalQuery]):
+    texts = list(dict.fromkeys(query.query for query in queries))
+    if not texts:
+        return
+    try:
+        store = await vector_store.aresolve()
+        await store.embedder.aencode(texts)
+    except Exception as e:
+        logger.warning(f"Batch embedding prefetch failed: {str(e)}")
+
+async def run_batch(
+    queries: List[Union[LegalQuery, str]],
+    concurrency: Optional[int] = None,
+    refresh: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    start_time = time.time()
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.batch_research_concurrency))
+    results: asyncio.Queue = asyncio.Queue()
+    shared: Dict[str, asyncio.Task] = {}
+    summary = {"queries": len(queries), "unique": 0, "succeeded": 0, "failed": 0, "semantic_cache_hits": 0}
+
+    async def research(query: LegalQuery) -> AgentResponse:
+        request_priority.set("batch")
+        async with semaphore:
+            return await orchestrator.research(query, refresh=refresh)
+
+    async def deliver(index: int, query: LegalQuery, task: asyncio.Task):
+        try:
+            response = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            response = AgentResponse(success=False, error=f"Orchestration error: {str(e)}", processing_time=0)
+        results.put_nowait((index, query.query, response))
+
+    valid = []
+    for index, query in enumerate(queries):
+        if isinstance(query, str):
+            results.put_nowait((index, None, AgentResponse(success=False, error=query, processing_time=0)))
+            continue
+
+        validation = await orchestrator.validate_query(query)
+        if not validation["valid"]:
+            error = f"Invalid query: {', '.join(validation['errors'])}"
+            results.put_nowait((index, query.query, AgentResponse(success=False, error=error, processing_time=0)))
+            continue
+        valid.append((index, query))
+
+    await _prefetch_embeddings([query for _, query in valid])
+
+    deliveries = []
+    for index, query in valid:
+        key = query_key(query)
+        if key not in shared:
+            shared[key] = asyncio.ensure_future(research(query))
+        deliveries.append(asyncio.ensure_future(deliver(index, query, shared[key])))
+    summary["unique"] = len(shared)
+
+    try:
+        for _ in range(len(queries)):
+            index, text, response = await results.get()
+            if response.success:
+                summary["succeeded"] += 1
+            else:
+                summary["failed"] += 1
+            summary["semantic_cache_hits"] += bool(response.cache)
+            yield {"event": "result", "data": {"index": index, "query": text, "response": jsonable_encoder(response)}}
+    finally:
+        for task in [*deliveries, *shared.values()]:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*deliveries, *shared.values(), return_exceptions=True)
+
+    elapsed = time.time() - start_time
+    yield {
+        "event": "done",
+        "data": {
+            **summary,
+            "elapsed_seconds": elapsed,
+            "queries_per_minute": len(queries) * 60 / elapsed if elapsed > 0 else 0.0,
+            "sharing": legal_api_manager.get_sharing_stats()
+        }
+    }
+
+async def main(path: str, output: Optional[str], concurrency: Optional[int], refresh: bool):
+    with open(path, "r", encoding="utf-8") as f:
+        queries = parse_queries(f.read())
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    await legal_api_manager.startup()
+    try:
+        async for event in run_batch(queries, concurrency, refresh):
+            if event["event"] == "done":
+                print(json.dumps(event["data"], indent=2), file=sys.stderr)
+                continue
+            out.write(json.dumps(event["data"]) + "\n")
+            out.flush()
+    finally:
+        await legal_api_manager.shutdown()
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a JSONL file of LegalQuery records as one research batch")
+    parser.add_argument("path", help="JSONL file with one LegalQuery object per line")
+    parser.add_argument("--output", help="Write JSONL results here instead of stdout")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--refresh", action="store_true", help="Bypass the semantic brief cache")
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.output, args.concurrency, args.refresh))
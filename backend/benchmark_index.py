@@ -0,0 +1,73 @@
+import argparse
+import time
+import faiss
+import numpy as np
+from typing import List, Optional
+from faiss_indexes import build_faiss_index, search_parameters, train_index
+
+def synthetic_embeddings(n: int, dimension: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype("float32")
+    assignments = rng.integers(0, clusters, n)
+    vectors = centers[assignments] + 0.5 * rng.standard_normal((n, dimension)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+def time_search(index: faiss.Index, queries: np.ndarray, k: int, params: Optional[faiss.SearchParameters]):
+    start = time.perf_counter()
+    _, found = index.search(queries, k, params=params)
+    elapsed = time.perf_counter() - start
+    return found, elapsed * 1000 / len(queries)
+
+def run(corpus: np.ndarray, queries: np.ndarray, k: int, index_types: List[str], sweep: List[int]):
+    dimension = corpus.shape[1]
+
+    flat = build_faiss_index(dimension, "flat")
+    flat.add(corpus)
+    truth, flat_latency = time_search(flat, queries, k, None)
+    print(f"{'index':<8} {'param':<14} {'recall@' + str(k):<10} {'ms/query':<10} {'build s':<8}")
+    print(f"{'flat':<8} {'-':<14} {1.0:<10.4f} {flat_latency:<10.3f} {'-':<8}")
+
+    for index_type in index_types:
+        build_start = time.perf_counter()
+        index = build_faiss_index(dimension, index_type)
+        train_index(index, corpus)
+        index.add(corpus)
+        build_time = time.perf_counter() - build_start
+
+        for value in sweep:
+            if index_type == "ivfpq":
+                label, params = f"nprobe={value}", search_parameters(index, nprobe=value)
+            else:
+                label, params = f"efSearch={value}", search_parameters(index, ef_search=max(value, k))
+
+            found, latency = time_search(index, queries, k, params)
+            print(f"{index_type:<8} {label:<14} {recall_at_k(truth, found):<10.4f} {latency:<10.3f} {build_time:<8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs latency of ANN index modes against the flat index")
+    parser.add_argument("--embeddings", help=".npy file of corpus embeddings; synthetic vectors are used if omitted")
+    parser.add_argument("--n", type=int, default=200000, help="synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-types", nargs="+", default=["hnsw", "ivfpq"])
+    parser.add_argument("--sweep", nargs="+", type=int, default=[1, 4, 16, 64, 256])
+    args = parser.parse_args()
+
+    if args.embeddings:
+        corpus = np.load(args.embeddings).astype("float32")
+        faiss.normalize_L2(corpus)
+    else:
+        corpus = synthetic_embeddings(args.n, args.dimension)
+
+    rng = np.random.default_rng(1)
+    queries = corpus[rng.choice(len(corpus), args.queries, replace=False)] + 0.05 * rng.standard_normal((args.queries, corpus.shape[1])).astype("float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    faiss.normalize_L2(queries)
+
+    run(corpus, queries, args.k, args.index_types, args.sweep)
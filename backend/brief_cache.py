@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import faiss
+import numpy as np
+from config import settings
+from coalescing import scope_key
+from models import AgentResponse, LegalQuery
+
+class _Entry:
+    def __init__(self, query: str, scope: str, response: AgentResponse, expires_at: float):
+        self.query = query
+        self.scope = scope
+        self.response = response
+        self.created_at = time.time()
+        self.expires_at = expires_at
+
+class SemanticBriefCache:
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+        capacity: Optional[int] = None
+    ):
+        self.threshold = settings.semantic_cache_threshold if threshold is None else threshold
+        self.ttl = settings.semantic_cache_ttl if ttl is None else ttl
+        self.capacity = settings.semantic_cache_capacity if capacity is None else capacity
+        self.index: Optional[faiss.IndexIDMap2] = None
+        self.entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "sets": 0, "expired": 0, "evictions": 0, "refreshes": 0}
+
+    def _ensure_index(self, dimension: int) -> faiss.IndexIDMap2:
+        if self.index is None or self.index.d != dimension:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            self.entries.clear()
+        return self.index
+
+    def _remove(self, entry_ids: list):
+        if not entry_ids:
+            return
+        self.index.remove_ids(np.asarray(entry_ids, dtype="int64"))
+        for entry_id in entry_ids:
+            self.entries.pop(entry_id, None)
+
+    def _purge_expired(self, now: float):
+        expired = [entry_id for entry_id, entry in self.entries.items() if entry.expires_at <= now]
+        self.counters["expired"] += len(expired)
+        self._remove(expired)
+
+    def lookup(self, query: LegalQuery, embedding: np.ndarray) -> Optional[Tuple[AgentResponse, Dict[str, Any]]]:
+        scope = scope_key(query)
+        now = time.time()
+
+        with self._lock:
+            if self.index is None or not self.entries:
+                self.counters["misses"] += 1
+                return None
+
+            self._purge_expired(now)
+            k = min(len(self.entries), settings.semantic_cache_candidates)
+            if k == 0:
+                self.counters["misses"] += 1
+                return None
+
+            scores, ids = self.index.search(np.asarray(embedding, dtype="float32").reshape(1, -1), k)
+            for score, entry_id in zip(scores[0], ids[0]):
+                if score < self.threshold:
+                    break
+                entry = self.entries.get(int(entry_id))
+                if entry is None or entry.scope != scope:
+                    continue
+
+                self.entries.move_to_end(int(entry_id))
+                self.counters["hits"] += 1
+                return entry.response, {
+                    "semantic_hit": True,
+                    "similarity": float(score),
+                    "matched_query": entry.query,
+                    "age_seconds": now - entry.created_at
+                }
+
+            self.counters["misses"] += 1
+            return None
+
+    def store(self, query: LegalQuery, embedding: np.ndarray, response: AgentResponse):
+        if not response.success or self.capacity <= 0:
+            return
+
+        embedding = np.asarray(embedding, dtype="float32").reshape(1, -1)
+        scope = scope_key(query)
+
+        with self._lock:
+            index = self._ensure_index(embedding.shape[1])
+            self._purge_expired(time.time())
+
+            if self.entries:
+                scores, ids = index.search(embedding, 1)
+                existing = self.entries.get(int(ids[0][0]))
+                if existing is not None and existing.scope == scope and scores[0][0] >= 0.9999:
+                    self._remove([int(ids[0][0])])
+
+            overflow = len(self.entries) + 1 - self.capacity
+            if overflow > 0:
+                self.counters["evictions"] += overflow
+                self._remove(list(self.entries)[:overflow])
+
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(embedding, np.asarray([entry_id], dtype="int64"))
+            self.entries[entry_id] = _Entry(query.query, scope, response, time.time() + self.ttl)
+            self.counters["sets"] += 1
+
+    def record_refresh(self):
+        with self._lock:
+            self.counters["refreshes"] += 1
+
+    def clear(self):
+        with self._lock:
+            if self.index is not None:
+                self.index.reset()
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "size": len(self.entries),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0
+            }
+
+brief_cache = SemanticBriefCache()
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from config import settings
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+def prompt_cache_key(model: str, temperature: float, prompt: str) -> str:
+    payload = json.dumps([model, round(float(temperature), 4), normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class TieredCache:
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str],
+        ttl: float,
+        max_memory_entries: int,
+        max_disk_entries: int,
+        retention: Optional[float] = None,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads
+    ):
+        self.name = name
+        self.table = f"cache_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.retention = retention or ttl
+        self.encode = encode
+        self.decode = decode
+        self.memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_prune = 0
+        self.counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0
+        }
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)"
+            )
+            self._conn.commit()
+
+        return self._conn
+
+    def _remember(self, key: str, value: Any, stored_at: float):
+        self.memory[key] = (value, stored_at)
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get_entry(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None and now - entry[1] <= max_age:
+                self.memory.move_to_end(key)
+                self.counters["hits"] += 1
+                self.counters["memory_hits"] += 1
+                return entry
+
+            conn = self._connect()
+            if conn is not None:
+                row = conn.execute(
+                    f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row is not None and now - row[1] <= max_age:
+                    conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    value = self.decode(row[0])
+                    self._remember(key, value, row[1])
+                    self.counters["hits"] += 1
+                    self.counters["disk_hits"] += 1
+                    return value, row[1]
+
+            self.counters["misses"] += 1
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, value, now)
+            self.counters["sets"] += 1
+
+            conn = self._connect()
+            if conn is not None:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, self.encode(value), now, now)
+                )
+                conn.commit()
+
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._prune(conn, now)
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        self._writes_since_prune = 0
+        expired = conn.execute(
+            f"DELETE FROM {self.table} WHERE stored_at < ?", (now - self.retention,)
+        ).rowcount
+        overflow = conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        ).rowcount
+        conn.commit()
+        self.counters["evictions"] += expired + overflow
+
+    async def aget_entry(self, key: str, max_age: Optional[float] = None) -> Optional[Tuple[Any, float]]:
+        if not self.path:
+            return self.get_entry(key, max_age)
+        return await asyncio.to_thread(self.get_entry, key, max_age)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        entry = await self.aget_entry(key)
+        return entry[0] if entry else None
+
+    async def aset(self, key: str, value: Any):
+        if not self.path:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute(f"DELETE FROM {self.table}")
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+
+        return {
+            **self.counters,
+            "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory)
+        }
+
+llm_cache = TieredCache(
+    "llm",
+    settings.llm_cache_path,
+    ttl=settings.llm_cache_ttl,
+    max_memory_entries=settings.llm_cache_memory_entries,
+    max_disk_entries=settings.llm_cache_disk_entries
+)
@@ -0,0 +1,217 @@
+import hashlib
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from config import settings
+from metadata_store import document_date
+from tokens import count_tokens
+
+ABBREVIATIONS = frozenset(
+    "v vs u.s s.ct l.ed f f.2d f.3d f.4d f.supp cir no nos inc co corp ltd dist ct app supp ed cal "
+    "e.g i.e id ibid cf mr mrs ms dr jr sr st art sec ch para pp p cl seq etc al".split()
+)
+
+_BOUNDARY = re.compile(r"[.!?][\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9§])")
+_HEADING = re.compile(
+    r"^\s*(?:(?:[IVXLC]+|[A-Z]|\d+)\.\s+[A-Z][^.]{0,80}|[A-Z][A-Z0-9 ,.'&\-]{3,60}|"
+    r"(?:BACKGROUND|DISCUSSION|ANALYSIS|CONCLUSION|OPINION|FACTS|HOLDING|DISSENT)\b.{0,60})\s*$"
+)
+PARENT_FIELDS = ("jurisdiction", "court", "date")
+# Bounds the prefix searched for one split piece; WordPiece maps any longer word to a single [UNK].
+MAX_CHARS_PER_TOKEN = 100
+
+def document_id(content: str, meta: Dict[str, Any]) -> str:
+    for key in ("id", "document_id", "doc_id"):
+        if meta.get(key) not in (None, ""):
+            return str(meta[key])
+    return hashlib.sha256(" ".join(content.split()).encode("utf-8")).hexdigest()[:32]
+
+def _is_boundary(text: str, match: re.Match) -> bool:
+    word = text[:match.start() + 1].rsplit(None, 1)[-1].strip("(\"'[").lower().rstrip(".")
+    return word not in ABBREVIATIONS and not (len(word) == 1 and word.isalpha())
+
+def iter_sentences(text: str, offset: int = 0) -> Iterator[Tuple[int, int]]:
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if not _is_boundary(text, match):
+            continue
+        end = match.end()
+        if text[start:end].strip():
+            yield offset + start, offset + end
+        start = end
+    if text[start:].strip():
+        yield offset + start, offset + len(text)
+
+def iter_blocks(text: str) -> Iterator[Tuple[Optional[str], int, int]]:
+    position = 0
+    for block in re.split(r"(\n\s*\n)", text):
+        start, position = position, position + len(block)
+        stripped = block.strip()
+        if not stripped:
+            continue
+        if "\n" not in stripped and _HEADING.match(stripped):
+            yield stripped, start, position
+        else:
+            yield None, start, position
+
+def _split_long(text: str, start: int, end: int, max_tokens: int, count: Callable[[str], int]) -> Iterator[Tuple[int, int]]:
+    position = start
+    while position < end:
+        while position < end and text[position].isspace():
+            position += 1
+        if position >= end:
+            return
+
+        remaining = text[position:min(end, position + max_tokens * MAX_CHARS_PER_TOKEN)]
+        if position + len(remaining) == end and count(remaining) <= max_tokens:
+            length = len(remaining)
+        else:
+            low, high = 1, len(remaining)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if count(remaining[:middle]) <= max_tokens:
+                    low = middle
+                else:
+                    high = middle - 1
+            cut = max(remaining.rfind(space, 0, low + 1) for space in " \n\t")
+            length = cut if cut > 0 else low
+
+        yield position, position + len(remaining[:length].rstrip())
+        position += length
+
+def iter_passages(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    count: Optional[Callable[[str], int]] = None
+) -> Iterator[Dict[str, Any]]:
+    max_tokens = max_tokens or settings.chunk_max_tokens
+    overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+    count = count or (lambda passage: count_tokens(passage, settings.llm_model))
+    window: List[Tuple[int, int, int]] = []
+    size = 0
+    section: Optional[str] = None
+    index = 0
+
+    def flush(keep_overlap: bool) -> Optional[Dict[str, Any]]:
+        nonlocal window, size, index
+        if not window:
+            return None
+
+        passage = {
+            "text": text[window[0][0]:window[-1][1]].strip(),
+            "start": window[0][0],
+            "end": window[-1][1],
+            "section": section,
+            "chunk_index": index
+        }
+        index += 1
+
+        carried: List[Tuple[int, int, int]] = []
+        if keep_overlap:
+            for sentence in reversed(window[1:]):
+                if sum(tokens for _, _, tokens in carried) + sentence[2] > overlap_tokens:
+                    break
+                carried.insert(0, sentence)
+        window, size = carried, sum(tokens for _, _, tokens in carried)
+        return passage
+
+    for heading, block_start, block_end in iter_blocks(text):
+        if heading is not None:
+            passage = flush(keep_overlap=False)
+            if passage:
+                yield passage
+            section = heading
+            continue
+
+        for start, end in iter_sentences(text[block_start:block_end], block_start):
+            tokens = count(text[start:end])
+            pieces = [(start, end, tokens)] if tokens <= max_tokens else [
+                (piece_start, piece_end, count(text[piece_start:piece_end]))
+                for piece_start, piece_end in _split_long(text, start, end, max_tokens, count)
+            ]
+
+            for piece in pieces:
+                if window and size + piece[2] > max_tokens:
+                    passage = flush(keep_overlap=True)
+                    if passage:
+                        yield passage
+                window.append(piece)
+                size += piece[2]
+
+    passage = flush(keep_overlap=False)
+    if passage:
+        yield passage
+
+def parent_reference(parent_id: str, meta: Dict[str, Any], passage: Dict[str, Any]) -> Dict[str, Any]:
+    reference = {
+        "parent_id": parent_id,
+        "chunk_index": passage["chunk_index"],
+        "start": passage["start"],
+        "end": passage["end"],
+        "content": passage["text"]
+    }
+    if passage["section"]:
+        reference["section"] = passage["section"]
+    for key in PARENT_FIELDS:
+        value = document_date(meta) if key == "date" else meta.get(key)
+        if value is not None:
+            reference[key] = value
+    return reference
+
+def iter_chunks(
+    documents: Iterable[str],
+    metadata: Iterable[Dict[str, Any]],
+    parents: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+    inline_parent: bool = False,
+    max_tokens: Optional[int] = None,
+    count: Optional[Callable[[str], int]] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for document, meta in zip(documents, metadata):
+        parent_id = document_id(document, meta)
+        parent_meta = {key: value for key, value in meta.items() if key != "content"}
+        chunks = 0
+
+        for passage in iter_passages(document, max_tokens, count=count):
+            chunks += 1
+            reference = parent_reference(parent_id, meta, passage)
+            yield passage["text"], {**parent_meta, **reference} if inline_parent else reference
+
+        if parents is not None:
+            parents.append((parent_id, {**parent_meta, "length": len(document), "chunks": chunks}))
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def collapse_hits(results: Sequence[Dict[str, Any]], k: int, parents: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    collapsed: Dict[str, Dict[str, Any]] = {}
+
+    for position, result in enumerate(results):
+        meta = result.get("metadata") or {}
+        parent_id = meta.get("parent_id") or f"_{position}"
+        passage = {
+            "content": result.get("content", ""),
+            "score": result["score"],
+            "chunk_index": meta.get("chunk_index"),
+            "section": meta.get("section")
+        }
+
+        hit = collapsed.get(parent_id)
+        if hit is None:
+            parent = parents.get(parent_id, {})
+            collapsed[parent_id] = {
+                **result,
+                "metadata": {**parent, **meta},
+                "passages": [passage]
+            }
+        elif len(hit["passages"]) < settings.chunk_passages_per_hit:
+            hit["passages"].append(passage)
+
+    hits = sorted(collapsed.values(), key=lambda hit: hit["score"], reverse=True)
+    return hits[:k]
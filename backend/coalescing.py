@@ -0,0 +1,92 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+from llm_governor import FlightPriority, current_priority, flight_priority
+from models import LegalQuery
+
+T = TypeVar("T")
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split()).rstrip("?.! ")
+
+def _scope(query: LegalQuery) -> Dict[str, Any]:
+    return {
+        "jurisdiction": _normalize(query.jurisdiction),
+        "case_types": sorted({_normalize(case_type) for case_type in query.case_types or []}),
+        "court": _normalize(query.court),
+        "date_from": query.date_from.isoformat() if query.date_from else None,
+        "date_to": query.date_to.isoformat() if query.date_to else None
+    }
+
+def _digest(payload: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def scope_key(query: LegalQuery) -> str:
+    return _digest(_scope(query))
+
+def query_key(query: LegalQuery) -> str:
+    return _digest({**_scope(query), "query": _normalize(query.query)})
+
+class _Flight(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]", priority: FlightPriority):
+        self.task = task
+        self.priority = priority
+        self.waiters = 0
+
+class SingleFlight(Generic[T]):
+    def __init__(self, on_join: Optional[Callable[[str], None]] = None):
+        self._flights: Dict[str, _Flight[T]] = {}
+        self.on_join = on_join
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._flights
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            # The shared work runs in a fresh context so it doesn't inherit the leader's request state,
+            # and its LLM calls use the most urgent priority of the callers waiting on it.
+            priority = FlightPriority(current_priority())
+            context = contextvars.Context()
+            context.run(flight_priority.set, priority)
+            flight = _Flight(context.run(asyncio.ensure_future, func()), priority)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, flight=flight: self._forget(key, flight))
+            self.leaders += 1
+            role = "leader"
+        else:
+            flight.priority.raise_to(current_priority())
+            self.followers += 1
+            role = "follower"
+
+        if self.on_join:
+            self.on_join(role)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                self.abandoned += 1
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight[T]):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(flight.waiters for flight in self._flights.values()),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "abandoned": self.abandoned
+        }
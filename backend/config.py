@@ -1,13 +1,129 @@
 import os
-from pydantic import BaseSettings
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:
+    from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     pinecone_api_key: str = os.getenv("PINECONE_API_KEY", "")
     pinecone_environment: str = os.getenv("PINECONE_ENVIRONMENT", "us-west1-gcp")
     courtlistener_api_key: str = os.getenv("COURTLISTENER_API_KEY", "")
-    vector_dimension: int = 1536
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    embedding_provider: str = os.getenv("EMBEDDING_PROVIDER", "sentence_transformers")
+    local_embedding_dimension: int = 384
+    embedding_workers: int = 2
+    embedding_batch_size: int = 64
+    embedding_max_batch_size: int = 64
+    embedding_max_wait_ms: float = 5.0
+    embedding_cache_size: int = 10000
+    vector_score_threshold: float = 0.5
+    hybrid_search: bool = True
+    hybrid_candidates: int = 50
+    rrf_k: int = 60
+    filter_exact_search_max: int = 4096
+    filter_candidate_max: int = 50000
+    filter_overfetch: int = 4
+    filter_post_search_max: int = 10000
+    reranker_backend: str = os.getenv("RERANKER_BACKEND", "cross_encoder")
+    reranker_model: str = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    reranker_top_k: int = 5
+    reranker_batch_size: int = 32
+    reranker_max_length: int = 512
+    reranker_scale: float = 1.0
+    reranker_bias: float = 0.0
+    vector_store_dir: str = os.getenv("VECTOR_STORE_DIR", ".")
+    faiss_mmap: bool = True
+    wal_checkpoint_vectors: int = 50000
+    ingestion_batch_size: int = 256
+    chunking_enabled: bool = True
+    chunk_max_tokens: int = 200
+    chunk_overlap_tokens: int = 40
+    chunk_batch_size: int = 256
+    chunk_search_multiplier: int = 4
+    chunk_search_max_candidates: int = 1000
+    chunk_passages_per_hit: int = 3
+    ingestion_spool_dir: str = os.getenv("INGESTION_SPOOL_DIR", "ingestion_spool")
+    ingestion_job_history: int = 200
+    research_jobs_path: str = os.getenv("RESEARCH_JOBS_PATH", "research_jobs.sqlite")
+    research_workers: int = 4
+    research_job_retention: float = 7 * 24 * 3600
+    research_poll_interval: float = 1.0
+    research_max_attempts: int = 3
+    faiss_index_type: str = os.getenv("FAISS_INDEX_TYPE", "flat")
+    faiss_hnsw_m: int = 32
+    faiss_hnsw_ef_construction: int = 200
+    faiss_ef_search: int = 64
+    faiss_ivf_nlist: int = 1024
+    faiss_pq_m: int = 48
+    faiss_pq_nbits: int = 8
+    faiss_nprobe: int = 16
+    faiss_max_training_points: int = 262144
+    faiss_train_points_per_list: int = 39
     index_name: str = "legal-research"
+    vector_store_backend: str = os.getenv("VECTOR_STORE_BACKEND", "faiss")
+    pinecone_upsert_batch_size: int = 100
+    pinecone_upsert_max_bytes: int = 2 * 1024 * 1024
+    pinecone_upsert_concurrency: int = 8
+    pinecone_upsert_retries: int = 3
+    pinecone_upsert_backoff: float = 0.5
+    pinecone_namespace_by_jurisdiction: bool = True
+    pinecone_namespace_refresh: float = 60.0
+    llm_model: str = os.getenv("LLM_MODEL", "gpt-4")
+    llm_temperature: float = 0.1
+    llm_provider: str = os.getenv("LLM_PROVIDER", "openai")
+    llm_prompt_cost_per_1k: float = 0.03
+    llm_completion_cost_per_1k: float = 0.06
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 30000
+    llm_max_concurrency: int = 16
+    llm_expected_completion_tokens: int = 512
+    llm_rate_limit_retries: int = 4
+    llm_backoff_base: float = 2.0
+    llm_backoff_max: float = 60.0
+    agent_step_retries: int = 2
+    agent_step_backoff: float = 0.5
+    llm_judge_sample_rate: float = 0.0
+    summary_min_chars: int = 40
+    summary_max_chars: int = 8000
+    brief_min_chars: int = 200
+    context_findings_tokens: int = 2000
+    context_summary_findings_tokens: int = 600
+    context_analysis_tokens: int = 800
+    context_patterns_tokens: int = 200
+    context_brief_section_tokens: int = 1500
+    context_max_finding_tokens: int = 400
+    context_min_finding_tokens: int = 48
+    context_dedup_threshold: float = 0.8
+    warmup_on_startup: bool = False
+    scheduler_max_concurrency: int = 4
+    upstream_timeout: float = 30.0
+    upstream_http2: bool = True
+    upstream_max_connections: int = 100
+    upstream_max_keepalive_connections: int = 20
+    upstream_keepalive_expiry: float = 30.0
+    upstream_max_concurrency_per_host: int = 10
+    search_cache_enabled: bool = True
+    search_cache_path: str = os.getenv("SEARCH_CACHE_PATH", "search_cache.sqlite")
+    courtlistener_cache_ttl: int = 6 * 3600
+    harvard_cache_ttl: int = 24 * 3600
+    search_cache_stale_while_revalidate: int = 24 * 3600
+    search_cache_memory_entries: int = 512
+    citation_memo_size: int = 20000
+    batch_research_concurrency: int = 8
+    batch_research_max_concurrency: int = 32
+    batch_research_max_queries: int = 1000
+    search_cache_disk_entries: int = 50000
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl: int = 24 * 3600
+    semantic_cache_capacity: int = 1000
+    semantic_cache_candidates: int = 5
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+    llm_cache_ttl: int = 7 * 24 * 3600
+    llm_cache_memory_entries: int = 1024
+    llm_cache_disk_entries: int = 100000
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,77 @@
+import re
+from typing import Any, Iterable, List, Optional, Set
+from config import settings
+from models import LegalFinding
+from tokens import count_tokens, truncate_tokens
+
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"[.!?;](?=\s)")
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def overlap(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+def finding_value(finding: LegalFinding) -> float:
+    return (finding.relevance_score + finding.authority_score) / 2
+
+def compress(text: str, max_tokens: int) -> str:
+    if count_tokens(text, settings.llm_model) <= max_tokens:
+        return text
+
+    clipped = truncate_tokens(" ".join(text.split()), max_tokens - 1, settings.llm_model)
+
+    ends = [m.end() for m in _SENTENCE_END.finditer(clipped)]
+    if ends and ends[-1] >= len(clipped) // 2:
+        clipped = clipped[:ends[-1]]
+    return clipped.rstrip() + " …"
+
+def dedupe(findings: Iterable[LegalFinding], threshold: Optional[float] = None) -> List[LegalFinding]:
+    threshold = settings.context_dedup_threshold if threshold is None else threshold
+    kept: List[LegalFinding] = []
+    seen: List[Set[str]] = []
+
+    for finding in sorted(findings, key=finding_value, reverse=True):
+        shingles = _shingles(finding.content)
+        if not shingles or any(overlap(shingles, other) >= threshold for other in seen):
+            continue
+        kept.append(finding)
+        seen.append(shingles)
+
+    return kept
+
+def pack_findings(findings: List[LegalFinding], max_tokens: int) -> str:
+    model = settings.llm_model
+    lines: List[str] = []
+    used = 0
+
+    for finding in dedupe(findings):
+        remaining = max_tokens - used
+        if remaining < settings.context_min_finding_tokens:
+            break
+
+        text = compress(finding.content, min(remaining - 1, settings.context_max_finding_tokens))
+        lines.append(text)
+        used += count_tokens(text, model) + 1
+
+    return "\n".join(lines)
+
+def pack_list(items: List[Any], max_tokens: int) -> List[str]:
+    packed: List[str] = []
+    used = 0
+
+    for item in items:
+        text = str(item)
+        tokens = count_tokens(text, settings.llm_model) + 2
+        if used + tokens > max_tokens:
+            break
+        packed.append(text)
+        used += tokens
+
+    return packed
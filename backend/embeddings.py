@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import settings
+from lazy import LazyComponent
+from metrics import record_embedding_batch, record_embedding_request
+
+SPECIAL_TOKENS = 2
+
+class LocalEmbeddingModel:
+    max_seq_length = 256
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True, **kwargs: Any) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for term in re.findall(r"\w+", text.lower()):
+                digest = hashlib.md5(term.encode("utf-8")).digest()
+                sign = 1.0 if digest[4] & 1 else -1.0
+                embeddings[row, int.from_bytes(digest[:4], "little") % self.dimension] += sign
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1.0, norms)
+        return embeddings
+
+def _load_model(model_name: str) -> Any:
+    if settings.embedding_provider == "local":
+        return LocalEmbeddingModel(settings.local_embedding_dimension)
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+class EmbeddingService:
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or (
+            settings.embedding_model if settings.embedding_provider != "local" else "local"
+        )
+        self.model = _load_model(self.model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.max_seq_length = getattr(self.model, "max_seq_length", None)
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.embedding_workers,
+            thread_name_prefix="embedding"
+        )
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "batches": 0,
+            "batched_texts": 0,
+            "max_batch_size": 0
+        }
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        start_time = time.perf_counter()
+        embeddings = self.model.encode(
+            texts,
+            batch_size=settings.embedding_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        record_embedding_batch(time.perf_counter() - start_time)
+        return np.asarray(embeddings, dtype="float32").reshape(len(texts), self.dimension)
+
+    def count_tokens(self, text: str) -> int:
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.tokenize(text))
+        return len(re.findall(r"\w+|[^\w\s]", text))
+
+    def max_input_tokens(self) -> Optional[int]:
+        if not self.max_seq_length:
+            return None
+        return self.max_seq_length - SPECIAL_TOKENS
+
+    def _cache_get(self, text: str) -> Optional[np.ndarray]:
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+            return embedding
+
+    def _cache_put(self, texts: List[str], embeddings: np.ndarray):
+        with self._cache_lock:
+            for text, embedding in zip(texts, embeddings):
+                self._cache[text] = embedding
+                self._cache.move_to_end(text)
+            while len(self._cache) > settings.embedding_cache_size:
+                self._cache.popitem(last=False)
+
+    async def aencode(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        futures = []
+        start_time = time.perf_counter()
+        cache_hits = 0
+
+        for text in texts:
+            self.stats["requests"] += 1
+            cached = self._cache_get(text) if use_cache else None
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                cache_hits += 1
+                future = loop.create_future()
+                future.set_result(cached)
+            else:
+                future = self._enqueue(loop, text)
+            futures.append(future)
+
+        embeddings = await asyncio.gather(*futures)
+        record_embedding_request(len(texts), cache_hits, time.perf_counter() - start_time)
+        return np.vstack(embeddings).astype("float32") if embeddings else np.zeros((0, self.dimension), dtype="float32")
+
+    def _enqueue(self, loop: asyncio.AbstractEventLoop, text: str) -> asyncio.Future:
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= settings.embedding_max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(settings.embedding_max_wait_ms / 1000, self._flush, loop)
+
+        return future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        texts = list(dict.fromkeys(text for text, _ in pending))
+        self.stats["batches"] += 1
+        self.stats["batched_texts"] += len(texts)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(texts))
+
+        batch = loop.run_in_executor(self._executor, self.encode, texts)
+        batch.add_done_callback(lambda done: self._resolve(done, texts, pending))
+
+    def _resolve(self, done: asyncio.Future, texts: List[str], pending: List[Tuple[str, asyncio.Future]]):
+        if done.cancelled() or done.exception() is not None:
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        embeddings = done.result()
+        self._cache_put(texts, embeddings)
+        by_text = dict(zip(texts, embeddings))
+
+        for text, future in pending:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+
+        return {
+            **self.stats,
+            "avg_batch_size": self.stats["batched_texts"] / batches if batches else 0.0,
+            "cache_entries": len(self._cache),
+            "cache_hit_rate": self.stats["cache_hits"] / self.stats["requests"] if self.stats["requests"] else 0.0
+        }
+
+embedding_service = LazyComponent("embedding_service", EmbeddingService)
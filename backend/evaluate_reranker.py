@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from typing import Any, Dict, List, Optional
+from llm import llm
+from reranker import CrossEncoderReranker, LLMReranker
+
+def load_examples(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def ndcg_at_k(ranked: List[int], relevant: List[int], k: int) -> float:
+    dcg = sum(1.0 / math.log2(rank + 2) for rank, i in enumerate(ranked[:k]) if i in relevant)
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+def recall_at_k(ranked: List[int], relevant: List[int], k: int) -> float:
+    return len(set(ranked[:k]) & set(relevant)) / len(relevant) if relevant else 0.0
+
+def overlap_at_k(a: List[int], b: List[int], k: int) -> float:
+    return len(set(a[:k]) & set(b[:k])) / k
+
+async def llm_predict(prompt: str) -> str:
+    model = await llm.aresolve()
+    return await model.apredict(prompt)
+
+async def rank_all(ranker: Any, examples: List[Dict[str, Any]], k: int):
+    rankings, elapsed = [], 0.0
+    for example in examples:
+        start = time.perf_counter()
+        ranking = await ranker.arank(example["query"], example["passages"], k)
+        elapsed += time.perf_counter() - start
+        rankings.append([i for i, _ in ranking])
+    return rankings, elapsed * 1000 / len(examples)
+
+def report(name: str, rankings: List[List[int]], latency: float, examples: List[Dict[str, Any]], k: int, reference: Optional[List[List[int]]]):
+    labelled = [(r, e["relevant"]) for r, e in zip(rankings, examples) if e.get("relevant")]
+    ndcg = sum(ndcg_at_k(r, rel, k) for r, rel in labelled) / len(labelled) if labelled else float("nan")
+    recall = sum(recall_at_k(r, rel, k) for r, rel in labelled) / len(labelled) if labelled else float("nan")
+    overlap = sum(overlap_at_k(r, ref, k) for r, ref in zip(rankings, reference)) / len(rankings) if reference else float("nan")
+    top1 = sum(bool(r and ref and r[0] == ref[0]) for r, ref in zip(rankings, reference)) / len(rankings) if reference else float("nan")
+    print(f"{name:<14} {ndcg:<10.4f} {recall:<10.4f} {overlap:<12.4f} {top1:<10.4f} {latency:<10.1f}")
+
+async def run(examples: List[Dict[str, Any]], k: int, model_name: Optional[str], skip_llm: bool):
+    cross_encoder = CrossEncoderReranker(model_name)
+    ce_rankings, ce_latency = await rank_all(cross_encoder, examples, k)
+
+    llm_rankings = None
+    if not skip_llm:
+        llm_rankings, llm_latency = await rank_all(LLMReranker(llm_predict), examples, k)
+
+    print(f"{'ranker':<14} {'nDCG@' + str(k):<10} {'recall@' + str(k):<10} {'overlap@' + str(k):<12} {'top1 agr':<10} {'ms/query':<10}")
+    if llm_rankings is not None:
+        report("llm", llm_rankings, llm_latency, examples, k, llm_rankings)
+    report("cross_encoder", ce_rankings, ce_latency, examples, k, llm_rankings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the cross-encoder reranker with the LLM ranker offline")
+    parser.add_argument("examples", help='JSONL of {"query": ..., "passages": [...], "relevant": [indices]} records; "relevant" is optional')
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--model", help="cross-encoder model; defaults to RERANKER_MODEL")
+    parser.add_argument("--skip-llm", action="store_true", help="only score the cross-encoder (no OpenAI calls)")
+    args = parser.parse_args()
+
+    asyncio.run(run(load_examples(args.examples), args.k, args.model, args.skip_llm))
@@ -0,0 +1,93 @@
+import faiss
+import numpy as np
+from typing import Any, Dict, Optional
+from config import settings
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+def index_factory_string(index_type: str) -> str:
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{settings.faiss_hnsw_m}"
+    if index_type == "ivfpq":
+        return f"IVF{settings.faiss_ivf_nlist},PQ{settings.faiss_pq_m}x{settings.faiss_pq_nbits}"
+    raise ValueError(f"Unknown FAISS index type '{index_type}', expected one of {INDEX_TYPES}")
+
+def build_faiss_index(dimension: int, index_type: Optional[str] = None) -> faiss.Index:
+    index_type = index_type or settings.faiss_index_type
+    index = faiss.index_factory(dimension, index_factory_string(index_type), faiss.METRIC_INNER_PRODUCT)
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = settings.faiss_hnsw_ef_construction
+        index.hnsw.efSearch = settings.faiss_ef_search
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = settings.faiss_nprobe
+
+    return index
+
+def describe_index(index: faiss.Index) -> Dict[str, Any]:
+    if faiss.try_extract_index_ivf(index) is not None:
+        index_type = "ivfpq"
+    elif isinstance(index, faiss.IndexHNSW):
+        index_type = "hnsw"
+    else:
+        index_type = "flat"
+
+    return {
+        "index_type": index_type,
+        "ntotal": int(index.ntotal),
+        "is_trained": bool(index.is_trained)
+    }
+
+def min_training_points(index: faiss.Index) -> int:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return 1
+    pq = getattr(faiss.downcast_index(index), "pq", None)
+    return max(ivf.nlist, pq.ksub if pq is not None else 1)
+
+def training_threshold(index: faiss.Index) -> int:
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return 1
+    return max(ivf.nlist * settings.faiss_train_points_per_list, min_training_points(index))
+
+def train_index(index: faiss.Index, embeddings: np.ndarray):
+    if index.is_trained:
+        return
+
+    min_points = min_training_points(index)
+    if len(embeddings) < min_points:
+        raise ValueError(
+            f"Index needs at least {min_points} training vectors, got {len(embeddings)}; "
+            "train it on a representative sample first"
+        )
+
+    max_points = settings.faiss_max_training_points
+    if len(embeddings) > max_points:
+        sample = np.random.default_rng(0).choice(len(embeddings), max_points, replace=False)
+        embeddings = embeddings[sample]
+
+    index.train(np.ascontiguousarray(embeddings, dtype="float32"))
+
+def search_parameters(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    selector: Optional[faiss.IDSelector] = None
+) -> Optional[faiss.SearchParameters]:
+    if faiss.try_extract_index_ivf(index) is not None:
+        params = faiss.SearchParametersIVF(nprobe=nprobe or settings.faiss_nprobe)
+    elif isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(efSearch=ef_search or settings.faiss_ef_search)
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+
+    if selector is not None:
+        params.sel = selector
+    return params
@@ -0,0 +1,110 @@
+import json
+import os
+import struct
+import zlib
+import faiss
+import numpy as np
+from typing import Any, Dict, Iterator, List, Tuple
+
+WAL_MAGIC = b"VWAL"
+WAL_HEADER = struct.Struct("<4sQIII")
+WAL_CHECKSUM = struct.Struct("<I")
+
+def _fsync_directory(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_bytes(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(path)
+
+def atomic_write_json(path: str, data: Dict[str, Any]):
+    atomic_write_bytes(path, json.dumps(data).encode("utf-8"))
+
+def atomic_write_index(path: str, index: faiss.Index):
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    with open(tmp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(path)
+
+class VectorWAL:
+    def __init__(self, path: str, dimension: int):
+        self.path = path
+        self.dimension = dimension
+        self.pending_vectors = 0
+
+    def append(self, start_id: int, embeddings: np.ndarray, metadata: List[Dict[str, Any]]):
+        vectors = np.ascontiguousarray(embeddings, dtype="float32").tobytes()
+        meta = json.dumps(metadata, default=str).encode("utf-8")
+        header = WAL_HEADER.pack(WAL_MAGIC, start_id, len(embeddings), self.dimension, len(meta))
+        checksum = WAL_CHECKSUM.pack(zlib.crc32(meta + vectors))
+
+        with open(self.path, "ab") as f:
+            f.write(header + meta + vectors + checksum)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.pending_vectors += len(embeddings)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def rollback(self, size: int, vectors: int):
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                f.truncate(size)
+                os.fsync(f.fileno())
+        self.pending_vectors = max(self.pending_vectors - vectors, 0)
+
+    def replay(self) -> Iterator[Tuple[int, np.ndarray, List[Dict[str, Any]]]]:
+        if not os.path.exists(self.path):
+            return
+
+        valid_until = 0
+        with open(self.path, "rb") as f:
+            while True:
+                header = f.read(WAL_HEADER.size)
+                if len(header) < WAL_HEADER.size:
+                    break
+
+                magic, start_id, count, dimension, meta_len = WAL_HEADER.unpack(header)
+                if magic != WAL_MAGIC or dimension != self.dimension:
+                    break
+
+                body = f.read(meta_len + count * dimension * 4)
+                checksum = f.read(WAL_CHECKSUM.size)
+                if len(checksum) < WAL_CHECKSUM.size or len(body) < meta_len + count * dimension * 4:
+                    break
+                if WAL_CHECKSUM.unpack(checksum)[0] != zlib.crc32(body):
+                    break
+
+                valid_until = f.tell()
+                metadata = json.loads(body[:meta_len])
+                embeddings = np.frombuffer(body[meta_len:], dtype="float32").reshape(count, dimension)
+                yield start_id, embeddings, metadata
+
+        if valid_until < os.path.getsize(self.path):
+            with open(self.path, "rb+") as f:
+                f.truncate(valid_until)
+                os.fsync(f.fileno())
+
+    def reset(self):
+        if os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                os.fsync(f.fileno())
+        self.pending_vectors = 0
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import aiofiles
+from config import settings
+from vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+Batch = Tuple[List[str], List[Dict[str, Any]]]
+
+class IngestionJob:
+    def __init__(self, source: str):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.status = "queued"
+        self.total: Optional[int] = None
+        self.processed = 0
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.batches: Optional[Iterator[Batch]] = None
+        self.spool_path: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+
+        return {
+            "job_id": self.id,
+            "source": self.source,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "failed": self.failed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "documents_per_second": self.processed / elapsed if elapsed > 0 else 0.0
+        }
+
+def _chunk(documents: List[str], metadata: List[Dict[str, Any]], size: int) -> Iterator[Batch]:
+    for start in range(0, len(documents), size):
+        yield documents[start:start + size], metadata[start:start + size]
+
+def parse_record(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    record = json.loads(line)
+    if isinstance(record, str):
+        return record, {}
+
+    content = record.get("content") or record.get("document") or record.get("text")
+    if not content:
+        return None
+
+    metadata = record.get("metadata") or {
+        key: value for key, value in record.items()
+        if key not in ("content", "document", "text")
+    }
+    return content, metadata
+
+class IngestionManager:
+    def __init__(self):
+        self.jobs: Dict[str, IngestionJob] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def startup(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def shutdown(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        self.queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _enqueue(self, job: IngestionJob) -> IngestionJob:
+        await self.startup()
+        self.jobs[job.id] = job
+        await self.queue.put(job)
+        self._prune_jobs()
+        return job
+
+    def _prune_jobs(self):
+        finished = [
+            job for job in self.jobs.values()
+            if job.status in ("completed", "failed")
+        ]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(len(finished) - settings.ingestion_job_history, 0)]:
+            self.jobs.pop(job.id, None)
+
+    async def submit(self, documents: List[str], metadata: List[Dict[str, Any]]) -> IngestionJob:
+        job = IngestionJob("json")
+        job.total = len(documents)
+        job.batches = _chunk(documents, metadata, settings.ingestion_batch_size)
+        return await self._enqueue(job)
+
+    async def submit_stream(self, chunks: AsyncIterator[bytes]) -> IngestionJob:
+        job = IngestionJob("jsonl")
+        os.makedirs(settings.ingestion_spool_dir, exist_ok=True)
+        job.spool_path = os.path.join(settings.ingestion_spool_dir, f"{job.id}.jsonl")
+
+        try:
+            async with aiofiles.open(job.spool_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+        except BaseException:
+            if os.path.exists(job.spool_path):
+                os.remove(job.spool_path)
+            raise
+
+        job.batches = self._read_spool(job)
+        return await self._enqueue(job)
+
+    def _read_spool(self, job: IngestionJob) -> Iterator[Batch]:
+        documents, metadata = [], []
+
+        with open(job.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = parse_record(line)
+                except (ValueError, AttributeError):
+                    record = None
+                if record is None:
+                    job.failed += 1
+                    continue
+
+                documents.append(record[0])
+                metadata.append(record[1])
+                if len(documents) >= settings.ingestion_batch_size:
+                    yield documents, metadata
+                    documents, metadata = [], []
+
+        if documents:
+            yield documents, metadata
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+
+        while True:
+            job = await self.queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+
+            try:
+                while True:
+                    batch = await loop.run_in_executor(self._executor, next, job.batches, None)
+                    if batch is None:
+                        break
+
+                    documents, metadata = batch
+                    await loop.run_in_executor(
+                        self._executor,
+                        lambda: vector_store.add_documents(documents, metadata)
+                    )
+                    job.processed += len(documents)
+
+                job.status = "completed"
+                if job.total is None:
+                    job.total = job.processed + job.failed
+            except Exception as e:
+                logger.error(f"Ingestion job {job.id} failed: {str(e)}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                job.batches = None
+                if job.spool_path and os.path.exists(job.spool_path):
+                    os.remove(job.spool_path)
+                self.queue.task_done()
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)]
+
+ingestion_manager = IngestionManager()
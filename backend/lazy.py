@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LazyComponent:
+    registry: Dict[str, "LazyComponent"] = {}
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._instance: Any = None
+        self._lock = threading.Lock()
+        self._init_seconds: Optional[float] = None
+        self._error: Optional[str] = None
+        LazyComponent.registry[name] = self
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self) -> Any:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    start = time.perf_counter()
+                    try:
+                        instance = self._factory()
+                    except Exception as e:
+                        self._error = str(e)
+                        raise
+                    self._init_seconds = time.perf_counter() - start
+                    self._error = None
+                    self._instance = instance
+                    logger.info(f"Initialized {self._name} in {self._init_seconds:.2f}s")
+        return self._instance
+
+    async def aresolve(self) -> Any:
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.resolve)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "initialized": self.is_initialized,
+            "init_seconds": self._init_seconds,
+            "error": self._error
+        }
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyComponent {self._name} initialized={self.is_initialized}>"
+
+class WarmupState:
+    def __init__(self):
+        self.status = "not_started"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+warmup_state = WarmupState()
+
+async def warm_up(names: List[str]):
+    warmup_state.status = "running"
+    warmup_state.started_at = time.time()
+
+    try:
+        for name in names:
+            await LazyComponent.registry[name].aresolve()
+        warmup_state.status = "completed"
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        warmup_state.status = "failed"
+        warmup_state.error = str(e)
+    finally:
+        warmup_state.finished_at = time.time()
+
+def startup_report() -> Dict[str, Any]:
+    return {
+        "warmup": {
+            "status": warmup_state.status,
+            "seconds": (warmup_state.finished_at - warmup_state.started_at)
+            if warmup_state.started_at and warmup_state.finished_at else None,
+            "error": warmup_state.error
+        },
+        "components": {
+            name: component.status()
+            for name, component in LazyComponent.registry.items()
+        }
+    }
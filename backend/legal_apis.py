@@ -3,104 +3,305 @@ import asyncio
 from typing import List, Dict, Any, Optional
 from config import settings
 from models import Citation
+from cache import TieredCache
+from coalescing import SingleFlight
+from metrics import current_request, record_search_cache, record_upstream_call
+from collections import OrderedDict
 from datetime import datetime
 import json
+import re
+import threading
+import time
 
-class CourtListenerAPI:
-    def __init__(self):
-        self.base_url = "https://www.courtlistener.com/api/rest/v3"
-        self.headers = {
-            "Authorization": f"Token {settings.courtlistener_api_key}",
-            "Content-Type": "application/json"
+class UpstreamClient:
+    def __init__(self, name: str, base_url: str, headers: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(settings.upstream_max_concurrency_per_host)
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "http2_responses": 0,
+            "in_flight": 0
         }
     
-    async def search_cases(self, query: str, jurisdiction: Optional[str] = None) -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            params = {
-                "q": query,
-                "type": "o",
-                "order_by": "score desc",
-                "format": "json"
-            }
-            
-            if jurisdiction:
-                params["court"] = jurisdiction
-            
+    async def startup(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=settings.upstream_http2,
+                timeout=httpx.Timeout(settings.upstream_timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.upstream_max_connections,
+                    max_keepalive_connections=settings.upstream_max_keepalive_connections,
+                    keepalive_expiry=settings.upstream_keepalive_expiry
+                )
+            )
+    
+    async def shutdown(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.stats["connections_opened"] += 1
+    
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        if self.client is None:
+            await self.startup()
+        
+        async with self._semaphore:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            start_time = time.perf_counter()
             try:
-                response = await client.get(
-                    f"{self.base_url}/search/",
+                response = await self.client.get(
+                    path,
                     params=params,
-                    headers=self.headers,
-                    timeout=30.0
+                    extensions={"trace": self._trace}
                 )
+                if response.http_version == "HTTP/2":
+                    self.stats["http2_responses"] += 1
                 response.raise_for_status()
-                return response.json().get("results", [])
+                record_upstream_call(self.name, time.perf_counter() - start_time)
+                return response
             except Exception as e:
-                return []
+                self.stats["errors"] += 1
+                record_upstream_call(self.name, time.perf_counter() - start_time, error=e)
+                raise
+            finally:
+                self.stats["in_flight"] -= 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        reused = max(requests - self.stats["connections_opened"], 0)
+        
+        return {
+            **self.stats,
+            "reused_connections": reused,
+            "reuse_ratio": reused / requests if requests else 0.0
+        }
+
+class CourtListenerAPI(UpstreamClient):
+    def __init__(self):
+        super().__init__(
+            "courtlistener",
+            "https://www.courtlistener.com/api/rest/v3",
+            headers={
+                "Authorization": f"Token {settings.courtlistener_api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+    
+    async def fetch_cases(self, query: str, jurisdiction: Optional[str] = None) -> List[Dict[str, Any]]:
+        params = {
+            "q": query,
+            "type": "o",
+            "order_by": "score desc",
+            "format": "json"
+        }
+        
+        if jurisdiction:
+            params["court"] = jurisdiction
+        
+        response = await self.get("/search/", params=params)
+        return response.json().get("results", [])
+    
+    async def search_cases(self, query: str, jurisdiction: Optional[str] = None) -> List[Dict[str, Any]]:
+        try:
+            return await self.fetch_cases(query, jurisdiction)
+        except Exception as e:
+            return []
     
     async def get_case_details(self, case_id: str) -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/opinions/{case_id}/",
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
-            except Exception:
-                return None
+        try:
+            response = await self.get(f"/opinions/{case_id}/")
+            return response.json()
+        except Exception:
+            return None
 
-class HarvardCaselawAPI:
+class HarvardCaselawAPI(UpstreamClient):
     def __init__(self):
-        self.base_url = "https://api.case.law/v1"
+        super().__init__("harvard", "https://api.case.law/v1")
+    
+    async def fetch_cases(self, query: str, jurisdiction: Optional[str] = None) -> List[Dict[str, Any]]:
+        params = {
+            "search": query,
+            "format": "json",
+            "full_case": "true"
+        }
+        
+        if jurisdiction:
+            params["jurisdiction"] = jurisdiction
+        
+        response = await self.get("/cases/", params=params)
+        return response.json().get("results", [])
     
     async def search_cases(self, query: str, jurisdiction: Optional[str] = None) -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            params = {
-                "search": query,
-                "format": "json",
-                "full_case": "true"
-            }
-            
-            if jurisdiction:
-                params["jurisdiction"] = jurisdiction
-            
-            try:
-                response = await client.get(
-                    f"{self.base_url}/cases/",
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json().get("results", [])
-            except Exception:
-                return []
+        try:
+            return await self.fetch_cases(query, jurisdiction)
+        except Exception:
+            return []
+
+def encode_citations(citations: List[Citation]) -> str:
+    return json.dumps([json.loads(citation.json()) for citation in citations])
+
+def decode_citations(payload: str) -> List[Citation]:
+    return [Citation(**item) for item in json.loads(payload)]
 
 class LegalAPIManager:
     def __init__(self):
         self.courtlistener = CourtListenerAPI()
         self.harvard = HarvardCaselawAPI()
+        self.sources = [self.courtlistener, self.harvard]
+        
+        source_ttls = {
+            "courtlistener": settings.courtlistener_cache_ttl,
+            "harvard": settings.harvard_cache_ttl
+        }
+        self.result_caches = {
+            source.name: TieredCache(
+                f"search_{source.name}",
+                settings.search_cache_path,
+                ttl=source_ttls[source.name],
+                max_memory_entries=settings.search_cache_memory_entries,
+                max_disk_entries=settings.search_cache_disk_entries,
+                retention=source_ttls[source.name] + settings.search_cache_stale_while_revalidate,
+                encode=encode_citations,
+                decode=decode_citations
+            )
+            for source in self.sources
+        }
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._searches: SingleFlight[List[Citation]] = SingleFlight()
+        self._citations: "OrderedDict[str, Optional[Citation]]" = OrderedDict()
+        self._citations_lock = threading.Lock()
+        self.citation_stats = {"parsed": 0, "reused": 0}
     
-    async def search_all_sources(self, query: str, jurisdiction: Optional[str] = None) -> List[Citation]:
-        tasks = [
-            self.courtlistener.search_cases(query, jurisdiction),
-            self.harvard.search_cases(query, jurisdiction)
-        ]
+    async def startup(self):
+        await asyncio.gather(*[source.startup() for source in self.sources])
+    
+    async def shutdown(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await asyncio.gather(*[source.shutdown() for source in self.sources])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            source.name: source.get_stats()
+            for source in self.sources
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return {
+            name: {**cache.stats(), "refreshing": sum(1 for key in self._refreshing if key.startswith(f"{name}:"))}
+            for name, cache in self.result_caches.items()
+        }
+    
+    def get_sharing_stats(self) -> Dict[str, Any]:
+        with self._citations_lock:
+            citations = {**self.citation_stats, "memoized": len(self._citations)}
+        return {"searches": self._searches.get_stats(), "citations": citations}
+    
+    def _cache_key(self, query: str, jurisdiction: Optional[str]) -> str:
+        normalized_query = re.sub(r"\s+", " ", query).strip().lower()
+        normalized_jurisdiction = (jurisdiction or "").strip().lower()
+        return json.dumps([normalized_query, normalized_jurisdiction])
+    
+    async def _fetch_and_store(self, source: UpstreamClient, key: str, query: str, jurisdiction: Optional[str]) -> List[Citation]:
+        cases = await source.fetch_cases(query, jurisdiction)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        citations = []
+        for case in cases:
+            citation = self._parse_case_to_citation(case)
+            if citation:
+                citations.append(citation)
+        
+        await self.result_caches[source.name].aset(key, citations)
+        return citations
+    
+    def _schedule_refresh(self, source: UpstreamClient, key: str, query: str, jurisdiction: Optional[str]):
+        refresh_key = f"{source.name}:{key}"
+        if refresh_key in self._refreshing:
+            return
+        
+        async def refresh():
+            try:
+                await self._fetch_and_store(source, key, query, jurisdiction)
+            except Exception:
+                pass
+            finally:
+                self._refreshing.pop(refresh_key, None)
+        
+        self._refreshing[refresh_key] = asyncio.ensure_future(refresh())
+    
+    async def _search_source(self, source: UpstreamClient, query: str, jurisdiction: Optional[str]) -> List[Citation]:
+        key = self._cache_key(query, jurisdiction)
+        request = current_request.get()
+        
+        async def search() -> List[Citation]:
+            current_request.set(request)
+            return await self._search_source_once(source, key, query, jurisdiction)
+        
+        return await self._searches.do(f"{source.name}:{key}", search)
+    
+    async def _search_source_once(self, source: UpstreamClient, key: str, query: str, jurisdiction: Optional[str]) -> List[Citation]:
+        cache = self.result_caches[source.name]
+        
+        if settings.search_cache_enabled:
+            entry = await cache.aget_entry(key, max_age=cache.retention)
+            if entry is not None:
+                citations, stored_at = entry
+                if time.time() - stored_at > cache.ttl:
+                    record_search_cache(source.name, "stale")
+                    self._schedule_refresh(source, key, query, jurisdiction)
+                else:
+                    record_search_cache(source.name, "fresh")
+                return citations
+            record_search_cache(source.name, "miss")
+        
+        try:
+            return await self._fetch_and_store(source, key, query, jurisdiction)
+        except Exception:
+            return []
+    
+    async def search_all_sources(self, query: str, jurisdiction: Optional[str] = None) -> List[Citation]:
+        results = await asyncio.gather(
+            *[self._search_source(source, query, jurisdiction) for source in self.sources],
+            return_exceptions=True
+        )
         citations = []
         
         for result in results:
             if isinstance(result, list):
-                for case in result:
-                    citation = self._parse_case_to_citation(case)
-                    if citation:
-                        citations.append(citation)
+                citations.extend(result)
         
         return citations
     
     def _parse_case_to_citation(self, case_data: Dict[str, Any]) -> Optional[Citation]:
+        key = json.dumps(case_data, sort_keys=True, default=str)
+        
+        with self._citations_lock:
+            if key in self._citations:
+                self._citations.move_to_end(key)
+                self.citation_stats["reused"] += 1
+                return self._citations[key]
+        
+        citation = self._build_citation(case_data)
+        
+        with self._citations_lock:
+            self.citation_stats["parsed"] += 1
+            self._citations[key] = citation
+            while len(self._citations) > settings.citation_memo_size:
+                self._citations.popitem(last=False)
+        return citation
+    
+    def _build_citation(self, case_data: Dict[str, Any]) -> Optional[Citation]:
         try:
             return Citation(
                 case_name=case_data.get("caseName", case_data.get("name", "Unknown")),
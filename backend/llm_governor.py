@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import settings
+from tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+request_priority: ContextVar[str] = ContextVar("llm_request_priority", default="interactive")
+
+class FlightPriority:
+    def __init__(self, priority: str):
+        self.priority = priority
+
+    def raise_to(self, priority: str):
+        if PRIORITIES.get(priority, PRIORITIES["batch"]) < PRIORITIES.get(self.priority, PRIORITIES["batch"]):
+            self.priority = priority
+
+flight_priority: ContextVar[Optional[FlightPriority]] = ContextVar("llm_flight_priority", default=None)
+
+def current_priority() -> str:
+    flight = flight_priority.get()
+    return flight.priority if flight is not None else request_priority.get()
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMGovernor:
+    def __init__(self):
+        self.requests = TokenBucket(settings.llm_requests_per_minute)
+        self.tokens = TokenBucket(settings.llm_tokens_per_minute)
+        self.in_flight = 0
+        self.backoff_until = 0.0
+        self.consecutive_rate_limits = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._waits: "deque[float]" = deque(maxlen=1000)
+        self.stats = {
+            "granted": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "tokens_reserved": 0,
+            "tokens_used": 0
+        }
+
+    async def acquire(self, tokens: int, priority: Optional[str] = None) -> float:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        rank = PRIORITIES.get(priority or current_priority(), PRIORITIES["batch"])
+        heapq.heappush(self._waiters, (rank, next(self._sequence), tokens, future))
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+
+        start = time.monotonic()
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        waited = time.monotonic() - start
+        self._waits.append(waited)
+        self.stats["total_wait_seconds"] += waited
+        return waited
+
+    def release(self, reserved_tokens: int = 0, used_tokens: Optional[int] = None):
+        self.in_flight -= 1
+        if used_tokens is not None:
+            self.tokens.adjust(used_tokens - reserved_tokens)
+            self.stats["tokens_used"] += used_tokens
+        self._pump()
+
+    def _pump(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= settings.llm_max_concurrency:
+                return
+
+            wait = max(
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+                self.backoff_until - time.monotonic()
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.stats["granted"] += 1
+            self.stats["tokens_reserved"] += tokens
+            future.set_result(None)
+
+    def _on_rate_limited(self, error: Exception):
+        self.stats["rate_limited"] += 1
+        self.consecutive_rate_limits += 1
+
+        ceiling = min(
+            settings.llm_backoff_max,
+            settings.llm_backoff_base * (2 ** (self.consecutive_rate_limits - 1))
+        )
+        delay = max(_retry_after(error) or 0.0, random.uniform(ceiling / 2, ceiling))
+        self.backoff_until = max(self.backoff_until, time.monotonic() + delay)
+        logger.warning(f"LLM rate limited; pausing new requests for {delay:.1f}s")
+
+    async def run(self, prompt: str, call: Callable[[], Awaitable[str]], priority: Optional[str] = None) -> Tuple[str, int, int]:
+        prompt_tokens = count_tokens(prompt, settings.llm_model)
+        reserved = prompt_tokens + settings.llm_expected_completion_tokens
+
+        for attempt in range(settings.llm_rate_limit_retries + 1):
+            await self.acquire(reserved, priority)
+            try:
+                response = await call()
+            except asyncio.CancelledError:
+                self.release()
+                raise
+            except Exception as e:
+                self.release()
+                if not is_rate_limit_error(e) or attempt == settings.llm_rate_limit_retries:
+                    raise
+                self._on_rate_limited(e)
+                self.stats["retries"] += 1
+                continue
+
+            completion_tokens = count_tokens(response, settings.llm_model)
+            self.consecutive_rate_limits = 0
+            self.release(reserved, prompt_tokens + completion_tokens)
+            return response, prompt_tokens, completion_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            **self.stats,
+            "queue_depth": sum(1 for *_, future in self._waiters if not future.done()),
+            "in_flight": self.in_flight,
+            "avg_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait_seconds": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "requests_available": round(self.requests.level, 1),
+            "tokens_available": round(self.tokens.level, 1),
+            "backoff_seconds": max(0.0, self.backoff_until - time.monotonic())
+        }
+
+llm_governor = LLMGovernor()
@@ -1,13 +1,24 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import uvicorn
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from datetime import date
+import asyncio
 import logging
+import json
 
 from models import LegalQuery, AgentResponse
 from orchestrator import orchestrator
 from vector_store import vector_store
+from legal_apis import legal_api_manager
+from ingestion import ingestion_manager
+from research_jobs import PRIORITIES, research_job_queue
+from batch_research import parse_queries, run_batch
+from config import settings
+from lazy import warm_up, warmup_state, startup_report
+from metrics import CONTENT_TYPE_LATEST, render_metrics
 
 app = FastAPI(
     title="Autonomous Legal Research Assistant",
@@ -26,8 +37,30 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_event():
+    await legal_api_manager.startup()
+    await ingestion_manager.startup()
+    await research_job_queue.startup()
+    if settings.warmup_on_startup:
+        components = ["embedding_service", "vector_store", "llm"]
+        if settings.reranker_backend == "cross_encoder":
+            components.append("reranker")
+        asyncio.ensure_future(warm_up(components))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await legal_api_manager.shutdown()
+    await ingestion_manager.shutdown()
+    await research_job_queue.shutdown()
+
 @app.post("/api/research", response_model=AgentResponse)
-async def research_legal_query(query: LegalQuery):
+async def research_legal_query(
+    query: LegalQuery,
+    async_mode: bool = Query(False, alias="async"),
+    priority: str = "normal",
+    refresh: bool = False
+):
     try:
         validation = await orchestrator.validate_query(query)
         
@@ -37,7 +70,16 @@ async def research_legal_query(query: LegalQuery):
                 detail=f"Invalid query: {', '.join(validation['errors'])}"
             )
         
-        result = await orchestrator.process_legal_query(query)
+        if async_mode:
+            if priority not in PRIORITIES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Priority must be one of: {', '.join(PRIORITIES)}"
+                )
+            job = await research_job_queue.submit(query, priority)
+            return JSONResponse(content=jsonable_encoder(job), status_code=202)
+        
+        result = await orchestrator.research(query, refresh=refresh)
         
         if not result.success:
             raise HTTPException(status_code=500, detail=result.error)
@@ -50,10 +92,90 @@ async def research_legal_query(query: LegalQuery):
         logger.error(f"Research endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/research/jobs")
+async def list_research_jobs(limit: int = 50):
+    return {"jobs": await research_job_queue.list_jobs(limit)}
+
+@app.get("/api/research/jobs/{job_id}")
+async def get_research_job(job_id: str):
+    job = await research_job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    return job
+
+@app.get("/api/research/jobs/{job_id}/result", response_model=AgentResponse)
+async def get_research_job_result(job_id: str):
+    job = await research_job_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    
+    result = await research_job_queue.get_result(job_id)
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"Research job is {job['status']}")
+    return result
+
+@app.post("/api/research/batch")
+async def batch_research(
+    request: Request,
+    concurrency: Optional[int] = Query(None, ge=1, le=settings.batch_research_max_concurrency),
+    refresh: bool = False
+):
+    try:
+        queries = parse_queries((await request.body()).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {str(e)}")
+    
+    if not queries:
+        raise HTTPException(status_code=400, detail="Batch contains no queries")
+    if len(queries) > settings.batch_research_max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(queries)} queries; the limit is {settings.batch_research_max_queries}"
+        )
+    
+    async def event_stream():
+        try:
+            async for event in run_batch(queries, concurrency, refresh):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Batch research error: {str(e)}")
+            yield json.dumps({"event": "error", "data": {"error": "Internal server error"}}) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/research/stream")
+async def stream_research_legal_query(query: LegalQuery):
+    validation = await orchestrator.validate_query(query)
+    
+    if not validation["valid"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid query: {', '.join(validation['errors'])}"
+        )
+    
+    async def event_stream():
+        try:
+            async for event in orchestrator.stream_legal_query(query):
+                yield json.dumps(jsonable_encoder(event)) + "\n"
+        except Exception as e:
+            logger.error(f"Research stream error: {str(e)}")
+            yield json.dumps({"event": "error", "data": {"error": "Internal server error"}}) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/health")
 async def health_check():
     try:
         health_status = await orchestrator.get_health_status()
+        health_status["research_jobs"] = await research_job_queue.get_stats()
         return JSONResponse(content=health_status)
     except Exception as e:
         logger.error(f"Health check error: {str(e)}")
@@ -62,7 +184,19 @@ async def health_check():
             status_code=503
         )
 
-@app.post("/api/add-documents")
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/api/ready")
+async def readiness_check():
+    ready = warmup_state.status in ("not_started", "completed")
+    return JSONResponse(
+        content={"ready": ready, **startup_report()},
+        status_code=200 if ready else 503
+    )
+
+@app.post("/api/add-documents", status_code=202)
 async def add_documents(documents: Dict[str, Any]):
     try:
         docs = documents.get("documents", [])
@@ -74,9 +208,9 @@ async def add_documents(documents: Dict[str, Any]):
                 detail="Documents and metadata arrays must have the same length"
             )
         
-        vector_store.add_documents(docs, metadata)
+        job = await ingestion_manager.submit(docs, metadata)
         
-        return {"message": f"Successfully added {len(docs)} documents"}
+        return {"message": f"Queued {len(docs)} documents for ingestion", **job.to_dict()}
         
     except HTTPException:
         raise
@@ -84,10 +218,48 @@ async def add_documents(documents: Dict[str, Any]):
         logger.error(f"Add documents error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add documents")
 
+@app.post("/api/add-documents/jsonl", status_code=202)
+async def add_documents_jsonl(request: Request):
+    try:
+        job = await ingestion_manager.submit_stream(request.stream())
+        return {"message": "Upload received, queued for ingestion", **job.to_dict()}
+    except Exception as e:
+        logger.error(f"Add documents upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to add documents")
+
+@app.get("/api/ingestion/jobs")
+async def list_ingestion_jobs():
+    return {"jobs": ingestion_manager.list_jobs()}
+
+@app.get("/api/ingestion/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    job = ingestion_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
+
 @app.get("/api/search")
-async def search_documents(query: str, k: int = 5):
+async def search_documents(
+    query: str,
+    k: int = 5,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    hybrid: Optional[bool] = None,
+    jurisdiction: Optional[str] = None,
+    court: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
     try:
-        results = vector_store.search(query, k)
+        filters = LegalQuery(
+            query=query,
+            jurisdiction=jurisdiction,
+            court=court,
+            date_from=date_from,
+            date_to=date_to
+        ).search_filters()
+        store = await vector_store.aresolve()
+        results = await store.asearch(query, k, nprobe=nprobe, ef_search=ef_search, hybrid=hybrid, filters=filters)
         return {"results": results}
     except Exception as e:
         logger.error(f"Search error: {str(e)}")
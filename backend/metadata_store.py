@@ -0,0 +1,240 @@
+import json
+import pickle
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the to was were what when which who with".split()
+)
+
+def fts_query(text: str) -> Optional[str]:
+    terms = [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS]
+    if not terms:
+        return None
+
+    phrases = [f'"{term}"' for term in dict.fromkeys(terms)]
+    if len(terms) > 1:
+        phrases.insert(0, '"' + " ".join(terms) + '"')
+    return " OR ".join(phrases)
+
+def _normalize_date(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def document_date(meta: Dict[str, Any]) -> Optional[str]:
+    return _normalize_date(meta.get("date", meta.get("date_filed", meta.get("decision_date"))))
+
+class MetadataStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY, content TEXT, "
+            "court TEXT COLLATE NOCASE, jurisdiction TEXT COLLATE NOCASE, date TEXT, "
+            "metadata TEXT NOT NULL)"
+        )
+        for column in ("court", "jurisdiction", "date"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS documents_{column} ON documents ({column})")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS parents (id TEXT PRIMARY KEY, metadata TEXT NOT NULL)")
+        self._create_lexical_index()
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM documents").fetchone()[0]
+
+    def _create_lexical_index(self):
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'"
+        ).fetchone()
+
+        self._conn.executescript(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+            "content, content='documents', content_rowid='id', tokenize='porter unicode61');"
+            "CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN "
+            "INSERT INTO documents_fts (rowid, content) VALUES (new.id, new.content); END;"
+            "CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN "
+            "INSERT INTO documents_fts (documents_fts, rowid, content) VALUES ('delete', old.id, old.content); END;"
+            "CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE ON documents BEGIN "
+            "INSERT INTO documents_fts (documents_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+            "INSERT INTO documents_fts (rowid, content) VALUES (new.id, new.content); END;"
+        )
+        if not exists:
+            self._conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _row(self, doc_id: int, meta: Dict[str, Any]) -> Tuple:
+        extra = {key: value for key, value in meta.items() if key != "content"}
+        return (
+            doc_id,
+            meta.get("content"),
+            meta.get("court"),
+            meta.get("jurisdiction"),
+            document_date(meta),
+            json.dumps(extra, default=str)
+        )
+
+    def add(self, start_id: int, metadata: Sequence[Dict[str, Any]], replace: bool = True):
+        rows = [self._row(start_id + offset, meta) for offset, meta in enumerate(metadata)]
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+
+        with self._lock:
+            self._conn.executemany(
+                f"{verb} INTO documents (id, content, court, jurisdiction, date, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._count = self._conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM documents").fetchone()[0]
+
+    def add_parents(self, parents: Sequence[Tuple[str, Dict[str, Any]]]):
+        rows = [(parent_id, json.dumps(meta, default=str)) for parent_id, meta in parents]
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO parents (id, metadata) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def get_parents(self, parent_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        parent_ids = list(dict.fromkeys(parent_ids))
+        results = {}
+
+        with self._lock:
+            for start in range(0, len(parent_ids), 500):
+                chunk = parent_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for parent_id, metadata in self._conn.execute(
+                    f"SELECT id, metadata FROM parents WHERE id IN ({placeholders})", chunk
+                ):
+                    results[parent_id] = json.loads(metadata)
+
+        return results
+
+    def _decode(self, content: Optional[str], metadata: str) -> Dict[str, Any]:
+        meta = json.loads(metadata)
+        if content is not None:
+            meta["content"] = content
+        return meta
+
+    def get_many(self, ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        if not ids:
+            return {}
+
+        results = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = [int(doc_id) for doc_id in ids[start:start + 500]]
+                placeholders = ",".join("?" * len(chunk))
+                for doc_id, content, metadata in self._conn.execute(
+                    f"SELECT id, content, metadata FROM documents WHERE id IN ({placeholders})", chunk
+                ):
+                    results[doc_id] = self._decode(content, metadata)
+
+        return results
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        last_id = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, content, metadata FROM documents WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+
+            last_id = rows[-1][0]
+            yield [(doc_id, self._decode(content, metadata)) for doc_id, content, metadata in rows]
+
+    def truncate(self, size: int):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE id >= ?", (size,))
+            self._conn.commit()
+            self._count = self._conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM documents").fetchone()[0]
+
+    def lexical_search(self, query: str, limit: int = 50, **filters: Any) -> List[Tuple[int, float]]:
+        match = fts_query(query)
+        if match is None:
+            return []
+
+        clauses, params = self._filter_clauses(**filters)
+        sql = "SELECT documents_fts.rowid, bm25(documents_fts) FROM documents_fts"
+        if clauses:
+            sql += " JOIN documents ON documents.id = documents_fts.rowid"
+        sql += " WHERE documents_fts MATCH ?"
+        for clause in clauses:
+            sql += f" AND {clause}"
+        sql += " ORDER BY rank LIMIT ?"
+
+        with self._lock:
+            rows = self._conn.execute(sql, [match, *params, limit]).fetchall()
+
+        return [(doc_id, -score) for doc_id, score in rows]
+
+    def _filter_clauses(
+        self,
+        court: Optional[str] = None,
+        jurisdiction: Optional[str] = None,
+        date_from: Optional[Any] = None,
+        date_to: Optional[Any] = None
+    ) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+
+        if court:
+            clauses.append("court LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(court)}%")
+        if jurisdiction:
+            clauses.append("jurisdiction = ?")
+            params.append(jurisdiction)
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(_normalize_date(date_from))
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(_normalize_date(date_to))
+
+        return clauses, params
+
+    def filter_ids(self, limit: Optional[int] = None, **filters: Any) -> List[int]:
+        clauses, params = self._filter_clauses(**filters)
+
+        sql = "SELECT id FROM documents"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def match_ids(self, ids: Sequence[int], **filters: Any) -> List[int]:
+        clauses, params = self._filter_clauses(**filters)
+        matched = []
+
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = [int(doc_id) for doc_id in ids[start:start + 500]]
+                sql = f"SELECT id FROM documents WHERE id IN ({','.join('?' * len(chunk))})"
+                for clause in clauses:
+                    sql += f" AND {clause}"
+                matched.extend(row[0] for row in self._conn.execute(sql, [*chunk, *params]))
+
+        return matched
+
+    def import_pickle(self, path: str):
+        with open(path, "rb") as f:
+            metadata = pickle.load(f)
+        self.add(0, metadata)
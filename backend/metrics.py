@@ -0,0 +1,200 @@
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+LLM_LATENCY = Histogram(
+    "legal_llm_request_seconds", "LLM call latency", ["agent", "step"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("legal_llm_tokens_total", "LLM tokens by kind", ["agent", "step", "kind"])
+LLM_COST = Counter("legal_llm_cost_usd_total", "Estimated LLM spend in USD", ["agent", "step"])
+LLM_CACHE = Counter("legal_llm_cache_requests_total", "LLM response cache lookups", ["agent", "result"])
+LLM_ERRORS = Counter("legal_llm_errors_total", "Failed LLM calls", ["agent", "step", "error"])
+
+UPSTREAM_LATENCY = Histogram(
+    "legal_upstream_request_seconds", "Legal database request latency", ["source"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter("legal_upstream_errors_total", "Failed legal database requests", ["source", "error"])
+SEARCH_CACHE = Counter("legal_search_cache_requests_total", "Case-law search cache lookups", ["source", "result"])
+
+EMBEDDING_LATENCY = Histogram(
+    "legal_embedding_batch_seconds", "Embedding model batch latency", buckets=LATENCY_BUCKETS
+)
+EMBEDDING_TEXTS = Counter("legal_embedding_texts_total", "Texts requested for embedding", ["result"])
+
+VECTOR_SEARCH_LATENCY = Histogram(
+    "legal_vector_search_seconds", "Vector store search latency", ["mode"], buckets=LATENCY_BUCKETS
+)
+
+STAGE_LATENCY = Histogram(
+    "legal_pipeline_stage_seconds", "Research pipeline stage latency", ["stage"], buckets=LATENCY_BUCKETS
+)
+AGENT_STEP_RETRIES = Counter("legal_agent_step_retries_total", "Agent sub-step retries", ["agent", "step", "reason"])
+LLM_JUDGE_VERDICTS = Counter("legal_llm_judge_verdicts_total", "Sampled LLM judge verdicts", ["agent", "verdict"])
+RESEARCH_REQUESTS = Counter("legal_research_requests_total", "Research requests by outcome", ["outcome"])
+SEMANTIC_CACHE = Counter("legal_semantic_cache_requests_total", "Semantic brief cache lookups", ["result"])
+RESEARCH_COALESCED = Counter(
+    "legal_research_coalesced_total", "Research requests by single-flight role", ["role"]
+)
+RESEARCH_DEDUPLICATED = Counter(
+    "legal_research_deduplicated_total", "Work saved by sharing in-flight research pipelines", ["kind"]
+)
+
+def llm_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (
+        prompt_tokens * settings.llm_prompt_cost_per_1k
+        + completion_tokens * settings.llm_completion_cost_per_1k
+    ) / 1000
+
+class RequestMetrics:
+    def __init__(self):
+        self.llm_steps: Dict[str, Dict[str, Any]] = {}
+        self.llm = {
+            "calls": 0,
+            "cache_hits": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+            "seconds": 0.0
+        }
+        self.upstream = {"calls": 0, "errors": 0, "cache_hits": 0, "seconds": 0.0}
+        self.embeddings = {"texts": 0, "cache_hits": 0, "seconds": 0.0}
+        self.vector_search = {"calls": 0, "seconds": 0.0}
+        self.agents: Dict[str, Dict[str, Any]] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "llm": {**self.llm, "steps": self.llm_steps},
+            "upstream": self.upstream,
+            "embeddings": self.embeddings,
+            "vector_search": self.vector_search,
+            "agents": self.agents
+        }
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request_metrics", default=None)
+
+def record_llm_call(
+    agent: str,
+    step: str,
+    seconds: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+    error: Optional[Exception] = None
+):
+    cost = llm_cost(prompt_tokens, completion_tokens)
+    LLM_LATENCY.labels(agent, step).observe(seconds)
+    LLM_TOKENS.labels(agent, step, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(agent, step, "completion").inc(completion_tokens)
+    LLM_COST.labels(agent, step).inc(cost)
+    if error is not None:
+        LLM_ERRORS.labels(agent, step, type(error).__name__).inc()
+
+    request = current_request.get()
+    if request is None:
+        return
+
+    request.llm["calls"] += 1
+    request.llm["errors"] += error is not None
+    request.llm["prompt_tokens"] += prompt_tokens
+    request.llm["completion_tokens"] += completion_tokens
+    request.llm["cost_usd"] += cost
+    request.llm["seconds"] += seconds
+
+    entry = request.llm_steps.setdefault(
+        f"{agent}.{step}",
+        {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+    )
+    entry["calls"] += 1
+    entry["seconds"] += seconds
+    entry["prompt_tokens"] += prompt_tokens
+    entry["completion_tokens"] += completion_tokens
+    entry["cost_usd"] += cost
+
+def record_llm_cache(agent: str, hit: bool):
+    LLM_CACHE.labels(agent, "hit" if hit else "miss").inc()
+
+    request = current_request.get()
+    if request is not None and hit:
+        request.llm["cache_hits"] += 1
+
+def record_upstream_call(source: str, seconds: float, error: Optional[Exception] = None):
+    UPSTREAM_LATENCY.labels(source).observe(seconds)
+    if error is not None:
+        UPSTREAM_ERRORS.labels(source, type(error).__name__).inc()
+
+    request = current_request.get()
+    if request is not None:
+        request.upstream["calls"] += 1
+        request.upstream["errors"] += error is not None
+        request.upstream["seconds"] += seconds
+
+def record_search_cache(source: str, result: str):
+    SEARCH_CACHE.labels(source, result).inc()
+
+    request = current_request.get()
+    if request is not None and result != "miss":
+        request.upstream["cache_hits"] += 1
+
+def record_embedding_batch(seconds: float):
+    EMBEDDING_LATENCY.observe(seconds)
+
+def record_embedding_request(texts: int, cache_hits: int, seconds: float):
+    EMBEDDING_TEXTS.labels("hit").inc(cache_hits)
+    EMBEDDING_TEXTS.labels("miss").inc(texts - cache_hits)
+
+    request = current_request.get()
+    if request is not None:
+        request.embeddings["texts"] += texts
+        request.embeddings["cache_hits"] += cache_hits
+        request.embeddings["seconds"] += seconds
+
+def record_vector_search(mode: str, seconds: float):
+    VECTOR_SEARCH_LATENCY.labels(mode).observe(seconds)
+
+    request = current_request.get()
+    if request is not None:
+        request.vector_search["calls"] += 1
+        request.vector_search["seconds"] += seconds
+
+def record_agent_result(agent: str, processing_time: float, retry_count: int, success: bool, error: Optional[str]):
+    request = current_request.get()
+    if request is not None:
+        request.agents[agent] = {
+            "processing_time": processing_time,
+            "retry_count": retry_count,
+            "success": success,
+            "error": error
+        }
+
+def record_step_retry(agent: str, step: str, reason: str):
+    AGENT_STEP_RETRIES.labels(agent, step, reason).inc()
+
+def record_judge_verdict(agent: str, passed: bool):
+    LLM_JUDGE_VERDICTS.labels(agent, "pass" if passed else "fail").inc()
+
+def record_stages(timings: Dict[str, Dict[str, float]]):
+    for stage, timing in timings.items():
+        STAGE_LATENCY.labels(stage).observe(timing["duration"])
+
+def record_research_request(outcome: str):
+    RESEARCH_REQUESTS.labels(outcome).inc()
+
+def record_semantic_cache(result: str):
+    SEMANTIC_CACHE.labels(result).inc()
+
+def record_coalesced(role: str):
+    RESEARCH_COALESCED.labels(role).inc()
+
+def record_deduplicated(summary: Optional[Dict[str, Any]]):
+    llm = (summary or {}).get("llm", {})
+    RESEARCH_DEDUPLICATED.labels("pipelines").inc()
+    RESEARCH_DEDUPLICATED.labels("llm_calls").inc(llm.get("calls", 0))
+    RESEARCH_DEDUPLICATED.labels("llm_tokens").inc(llm.get("prompt_tokens", 0) + llm.get("completion_tokens", 0))
+    RESEARCH_DEDUPLICATED.labels("llm_cost_usd").inc(llm.get("cost_usd", 0.0))
+    RESEARCH_DEDUPLICATED.labels("upstream_calls").inc((summary or {}).get("upstream", {}).get("calls", 0))
+
+def render_metrics() -> bytes:
+    return generate_latest()
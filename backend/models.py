@@ -1,11 +1,23 @@
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 
 class LegalQuery(BaseModel):
     query: str
     jurisdiction: Optional[str] = None
     case_types: Optional[List[str]] = None
+    court: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def search_filters(self) -> Dict[str, Any]:
+        filters = {
+            "jurisdiction": self.jurisdiction,
+            "court": self.court,
+            "date_from": self.date_from,
+            "date_to": self.date_to
+        }
+        return {key: value for key, value in filters.items() if value is not None}
 
 class Citation(BaseModel):
     case_name: str
@@ -38,10 +50,14 @@ class AgentResponse(BaseModel):
     data: Optional[Any] = None
     error: Optional[str] = None
     processing_time: float
+    stage_timings: Optional[Dict[str, Any]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    cache: Optional[Dict[str, Any]] = None
 
 class SubtaskResult(BaseModel):
     task_type: str
     success: bool
     data: Any
     processing_time: float
-    retry_count: int = 0 
\ No newline at end of file
+    retry_count: int = 0
+    error: Optional[str] = None 
\ No newline at end of file
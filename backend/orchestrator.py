@@ -1,12 +1,30 @@
 import asyncio
+import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Callable, Optional
+import numpy as np
+from config import settings
 from models import LegalQuery, LegalBrief, AgentResponse
+from scheduler import StageScheduler, StageError, new_request_limiter, request_limiter
+from cache import llm_cache
+from brief_cache import brief_cache
+from llm_governor import llm_governor
+from legal_apis import legal_api_manager
+from embeddings import embedding_service
+from vector_store import vector_store
+from lazy import startup_report
+from metrics import (
+    RequestMetrics, current_request, record_coalesced, record_deduplicated, record_research_request,
+    record_semantic_cache, record_stages
+)
+from coalescing import SingleFlight, query_key
 from agents.retriever_agent import retriever_agent
 from agents.analyzer_agent import analyzer_agent
 from agents.summarizer_agent import summarizer_agent
 from agents.composer_agent import composer_agent
 
+logger = logging.getLogger(__name__)
+
 class LegalResearchOrchestrator:
     def __init__(self):
         self.agents = {
@@ -15,81 +33,207 @@ class LegalResearchOrchestrator:
             "summarizer": summarizer_agent,
             "composer": composer_agent
         }
+        self.single_flight: SingleFlight[AgentResponse] = SingleFlight(on_join=record_coalesced)
     
-    async def process_legal_query(self, query: LegalQuery) -> AgentResponse:
+    async def research(self, query: LegalQuery, refresh: bool = False) -> AgentResponse:
         start_time = time.time()
+        embedding = await self._query_embedding(query) if settings.semantic_cache_enabled else None
         
-        try:
-            retrieval_result = await self.agents["retriever"].execute_with_retry(query)
-            
-            if not retrieval_result.success:
-                return AgentResponse(
-                    success=False,
-                    error="Failed to retrieve legal information",
-                    processing_time=time.time() - start_time
-                )
-            
-            findings = retrieval_result.data
-            
-            analysis_result = await self.agents["analyzer"].execute_with_retry(findings)
-            
-            if not analysis_result.success:
+        if embedding is not None and refresh:
+            brief_cache.record_refresh()
+            record_semantic_cache("refresh")
+        elif embedding is not None:
+            cached = brief_cache.lookup(query, embedding)
+            record_semantic_cache("hit" if cached else "miss")
+            if cached:
+                response, cache_info = cached
+                record_research_request("semantic_cache")
                 return AgentResponse(
-                    success=False,
-                    error="Failed to analyze legal findings",
-                    processing_time=time.time() - start_time
+                    success=True,
+                    data=response.data,
+                    processing_time=time.time() - start_time,
+                    stage_timings=response.stage_timings,
+                    cache=cache_info
                 )
+        
+        key = query_key(query)
+        joined = key in self.single_flight
+        response = await self.single_flight.do(key, lambda: self.process_legal_query(query))
+        if joined:
+            record_deduplicated(response.metrics)
+        elif embedding is not None:
+            brief_cache.store(query, embedding, response)
+        return response
+    
+    async def _query_embedding(self, query: LegalQuery) -> Optional[np.ndarray]:
+        try:
+            store = await vector_store.aresolve()
+            return await store.embedder.aencode([query.query])
+        except Exception as e:
+            logger.warning(f"Semantic cache disabled for this request: {str(e)}")
+            return None
+    
+    async def process_legal_query(self, query: LegalQuery) -> AgentResponse:
+        start_time = time.time()
+        scheduler = self._build_pipeline(query)
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        limiter_token = request_limiter.set(new_request_limiter())
+        
+        try:
+            results = await scheduler.run()
+            response = AgentResponse(
+                success=True,
+                data=results["composition"],
+                processing_time=time.time() - start_time
+            )
+        except StageError as e:
+            response = AgentResponse(
+                success=False,
+                error=str(e),
+                processing_time=time.time() - start_time
+            )
+        except Exception as e:
+            response = AgentResponse(
+                success=False,
+                error=f"Orchestration error: {str(e)}",
+                processing_time=time.time() - start_time
+            )
+        finally:
+            request_limiter.reset(limiter_token)
+            current_request.reset(token)
+        
+        response.stage_timings = scheduler.report()
+        response.metrics = metrics.summary()
+        record_stages(scheduler.timings())
+        record_research_request("success" if response.success else "error")
+        return response
+    
+    async def stream_legal_query(self, query: LegalQuery) -> AsyncIterator[Dict[str, Any]]:
+        start_time = time.time()
+        events: asyncio.Queue = asyncio.Queue()
+        
+        scheduler = self._build_pipeline(
+            query,
+            on_token=lambda token: events.put_nowait({"event": "token", "data": token}),
+            on_token_reset=lambda: events.put_nowait({"event": "token_reset", "data": None}),
+            on_complete=lambda stage, data: events.put_nowait({"event": stage, "data": data})
+        )
+        
+        async def run_pipeline():
+            metrics = RequestMetrics()
+            current_request.set(metrics)
+            request_limiter.set(new_request_limiter())
             
+            try:
+                await scheduler.run()
+                record_research_request("success")
+                events.put_nowait({
+                    "event": "done",
+                    "data": {
+                        "processing_time": time.time() - start_time,
+                        "stage_timings": scheduler.report(),
+                        "metrics": metrics.summary()
+                    }
+                })
+            except StageError as e:
+                record_research_request("error")
+                events.put_nowait({"event": "error", "data": {"stage": e.stage, "error": str(e)}})
+            except Exception as e:
+                record_research_request("error")
+                events.put_nowait({"event": "error", "data": {"error": f"Orchestration error: {str(e)}"}})
+            finally:
+                record_stages(scheduler.timings())
+        
+        yield {"event": "started", "data": {"query": query.query, "jurisdiction": query.jurisdiction}}
+        
+        task = asyncio.ensure_future(run_pipeline())
+        
+        try:
+            while True:
+                event = await events.get()
+                yield event
+                if event["event"] in ("done", "error"):
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+    
+    def _build_pipeline(
+        self,
+        query: LegalQuery,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_complete: Optional[Callable[[str, Any], None]] = None,
+        on_token_reset: Optional[Callable[[], None]] = None
+    ) -> StageScheduler:
+        scheduler = StageScheduler(on_complete=on_complete)
+        
+        async def retrieve():
+            result = await self.agents["retriever"].execute_with_retry(query)
+            if not result.success:
+                raise StageError("retrieval", result.error or "Failed to retrieve legal information")
+            return result.data
+        
+        async def analyze(findings):
+            result = await self.agents["analyzer"].execute_with_retry(findings)
+            if not result.success:
+                raise StageError("analysis", result.error or "Failed to analyze legal findings")
+            return result.data
+        
+        async def summarize(findings, analysis):
             summary_input = {
                 "findings": findings,
-                "analysis": analysis_result.data,
+                "analysis": analysis,
                 "query": query.query
             }
-            
-            summary_result = await self.agents["summarizer"].execute_with_retry(summary_input)
-            
-            if not summary_result.success:
-                return AgentResponse(
-                    success=False,
-                    error="Failed to summarize findings",
-                    processing_time=time.time() - start_time
-                )
-            
+            result = await self.agents["summarizer"].execute_with_retry(summary_input)
+            if not result.success:
+                raise StageError("summary", result.error or "Failed to summarize findings")
+            return result.data
+        
+        async def draft_legal_analysis(findings, analysis):
+            try:
+                return await self.agents["composer"].compose_legal_analysis(query.query, findings, analysis)
+            except Exception:
+                return None
+        
+        async def compose(findings, analysis, summary, legal_analysis):
             composition_input = {
                 "query": query.query,
                 "findings": findings,
-                "analysis": analysis_result.data,
-                "summary": summary_result.data
+                "analysis": analysis,
+                "summary": summary,
+                "legal_analysis": legal_analysis,
+                "on_token": on_token,
+                "on_token_reset": on_token_reset
             }
-            
-            composition_result = await self.agents["composer"].execute_with_retry(composition_input)
-            
-            if not composition_result.success:
-                return AgentResponse(
-                    success=False,
-                    error="Failed to compose legal brief",
-                    processing_time=time.time() - start_time
-                )
-            
-            processing_time = time.time() - start_time
-            
-            return AgentResponse(
-                success=True,
-                data=composition_result.data,
-                processing_time=processing_time
-            )
-            
-        except Exception as e:
-            return AgentResponse(
-                success=False,
-                error=f"Orchestration error: {str(e)}",
-                processing_time=time.time() - start_time
-            )
+            result = await self.agents["composer"].execute_with_retry(composition_input)
+            if not result.success:
+                raise StageError("composition", result.error or "Failed to compose legal brief")
+            return result.data
+        
+        scheduler.add("retrieval", retrieve)
+        scheduler.add("analysis", analyze, ["retrieval"])
+        scheduler.add("summary", summarize, ["retrieval", "analysis"])
+        scheduler.add("legal_analysis", draft_legal_analysis, ["retrieval", "analysis"])
+        scheduler.add("composition", compose, ["retrieval", "analysis", "summary", "legal_analysis"])
+        
+        return scheduler
     
     async def get_health_status(self) -> Dict[str, Any]:
         health_status = {
             "orchestrator": "healthy",
             "agents": {},
+            "llm_cache": llm_cache.stats(),
+            "llm_governor": llm_governor.get_stats(),
+            "upstream_http": legal_api_manager.get_stats(),
+            "coalescing": self.single_flight.get_stats(),
+            "search_cache": legal_api_manager.get_cache_stats(),
+            "semantic_cache": brief_cache.get_stats(),
+            "upstream_sharing": legal_api_manager.get_sharing_stats(),
+            "embeddings": embedding_service.get_stats() if embedding_service.is_initialized else None,
+            "startup": startup_report(),
             "timestamp": time.time()
         }
         
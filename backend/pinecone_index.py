@@ -0,0 +1,254 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from chunking import document_id
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+Vector = Tuple[str, List[float], Dict[str, Any]]
+
+PINECONE_MAX_VECTORS_PER_UPSERT = 1000
+PINECONE_MAX_REQUEST_BYTES = 2 * 1024 * 1024
+PINECONE_MAX_METADATA_BYTES = 40 * 1024
+DEFAULT_NAMESPACE = "default"
+
+def namespace_for(jurisdiction: Optional[str]) -> str:
+    if not jurisdiction:
+        return DEFAULT_NAMESPACE
+    return re.sub(r"[^a-z0-9]+", "-", jurisdiction.lower()).strip("-") or DEFAULT_NAMESPACE
+
+def normalize_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return " ".join(str(value).lower().split()) or None
+
+def clean_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in meta.items() if value is not None}
+
+def metadata_bytes(meta: Dict[str, Any]) -> int:
+    return len(json.dumps(meta, default=str, ensure_ascii=False).encode("utf-8"))
+
+def fit_metadata(meta: Dict[str, Any], max_bytes: int = PINECONE_MAX_METADATA_BYTES) -> Dict[str, Any]:
+    overflow = metadata_bytes(meta) - max_bytes
+    if overflow <= 0:
+        return meta
+
+    content = meta.get("content")
+    meta = dict(meta)
+    while overflow > 0 and isinstance(content, str) and content:
+        content = content[:max(0, len(content) - overflow)]
+        meta["content"] = content
+        meta["content_truncated"] = True
+        overflow = metadata_bytes(meta) - max_bytes
+
+    if overflow > 0:
+        raise ValueError(f"Metadata is {metadata_bytes(meta)} bytes, over the {max_bytes}-byte per-vector limit")
+    logger.warning(f"Truncated vector content to {len(content)} characters to fit Pinecone's metadata limit")
+    return meta
+
+def vector_bytes(vector: Vector) -> int:
+    vector_id, values, meta = vector
+    return len(vector_id) + 20 * len(values) + len(json.dumps(meta, default=str)) + 64
+
+def upsert_batches(
+    vectors: Sequence[Vector],
+    max_vectors: int = PINECONE_MAX_VECTORS_PER_UPSERT,
+    max_bytes: int = PINECONE_MAX_REQUEST_BYTES
+) -> Iterator[List[Vector]]:
+    max_vectors = min(max_vectors, PINECONE_MAX_VECTORS_PER_UPSERT)
+    max_bytes = min(max_bytes, PINECONE_MAX_REQUEST_BYTES)
+    batch: List[Vector] = []
+    size = 0
+
+    for vector in vectors:
+        vector_size = vector_bytes(vector)
+        if vector_size > max_bytes:
+            raise ValueError(f"Vector '{vector[0]}' is {vector_size} bytes, over the {max_bytes}-byte request limit")
+        if batch and (len(batch) >= max_vectors or size + vector_size > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(vector)
+        size += vector_size
+
+    if batch:
+        yield batch
+
+class PineconeUpserter:
+    def __init__(self, index: Any, concurrency: Optional[int] = None, retries: Optional[int] = None):
+        self.index = index
+        self.retries = settings.pinecone_upsert_retries if retries is None else retries
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency or settings.pinecone_upsert_concurrency,
+            thread_name_prefix="pinecone-upsert"
+        )
+        self.upserted = 0
+        self.batches = 0
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors_by_namespace: Dict[str, List[Vector]]) -> int:
+        futures = [
+            self.executor.submit(self._upsert_batch, batch, namespace)
+            for namespace, vectors in vectors_by_namespace.items()
+            for batch in upsert_batches(vectors, settings.pinecone_upsert_batch_size, settings.pinecone_upsert_max_bytes)
+        ]
+
+        errors = [future.exception() for future in futures]
+        failed = [error for error in errors if error is not None]
+        if failed:
+            raise failed[0]
+
+        return sum(future.result() for future in futures)
+
+    def _upsert_batch(self, batch: List[Vector], namespace: str) -> int:
+        for attempt in range(self.retries + 1):
+            try:
+                self.index.upsert(vectors=batch, namespace=namespace)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = random.uniform(0, settings.pinecone_upsert_backoff * 2 ** attempt)
+                logger.warning(f"Pinecone upsert of {len(batch)} vectors failed ({e}); retrying in {delay:.2f}s")
+                with self._lock:
+                    self.retried += 1
+                time.sleep(delay)
+
+        with self._lock:
+            self.upserted += len(batch)
+            self.batches += 1
+        return len(batch)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"upserted": self.upserted, "batches": self.batches, "retried": self.retried}
+
+def _matches(meta: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_matches(meta, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches(meta, clause) for clause in condition):
+                return False
+            continue
+
+        value = meta.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+            if operator in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+                if operator == "$gte" and not value >= operand:
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+                if operator == "$lte" and not value <= operand:
+                    return False
+
+    return True
+
+class InMemoryPineconeIndex:
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.namespaces: Dict[str, Dict[str, Tuple[np.ndarray, Dict[str, Any]]]] = {}
+        self.upsert_calls = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: Sequence[Vector], namespace: str = "", **kwargs: Any):
+        if len(vectors) > PINECONE_MAX_VECTORS_PER_UPSERT:
+            raise ValueError(f"Upsert of {len(vectors)} vectors exceeds {PINECONE_MAX_VECTORS_PER_UPSERT}")
+        size = sum(vector_bytes(vector) for vector in vectors)
+        if size > PINECONE_MAX_REQUEST_BYTES:
+            raise ValueError(f"Upsert request of {size} bytes exceeds {PINECONE_MAX_REQUEST_BYTES}")
+
+        rows = {}
+        for vector_id, values, meta in vectors:
+            if metadata_bytes(meta or {}) > PINECONE_MAX_METADATA_BYTES:
+                raise ValueError(f"Metadata for vector '{vector_id}' exceeds {PINECONE_MAX_METADATA_BYTES} bytes")
+            values = np.asarray(values, dtype="float32")
+            if values.shape != (self.dimension,):
+                raise ValueError(f"Vector '{vector_id}' has dimension {values.size}, expected {self.dimension}")
+            rows[vector_id] = (values / (np.linalg.norm(values) or 1.0), dict(meta or {}))
+
+        with self._lock:
+            self.namespaces.setdefault(namespace, {}).update(rows)
+            self.upsert_calls += 1
+        return SimpleNamespace(upserted_count=len(rows))
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        include_metadata: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        **kwargs: Any
+    ) -> SimpleNamespace:
+        query = np.asarray(vector, dtype="float32")
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        with self._lock:
+            rows = list(self.namespaces.get(namespace, {}).items())
+
+        matches = [
+            SimpleNamespace(id=vector_id, score=float(values @ query), metadata=meta if include_metadata else None)
+            for vector_id, (values, meta) in rows
+            if _matches(meta, filter)
+        ]
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return SimpleNamespace(matches=matches[:top_k], namespace=namespace)
+
+    def fetch(self, ids: List[str], namespace: str = "") -> SimpleNamespace:
+        with self._lock:
+            rows = self.namespaces.get(namespace, {})
+            vectors = {
+                vector_id: SimpleNamespace(id=vector_id, values=rows[vector_id][0].tolist(), metadata=rows[vector_id][1])
+                for vector_id in ids if vector_id in rows
+            }
+        return SimpleNamespace(vectors=vectors, namespace=namespace)
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, namespace: str = "", **kwargs: Any):
+        with self._lock:
+            if delete_all:
+                self.namespaces.pop(namespace, None)
+                return
+            rows = self.namespaces.get(namespace, {})
+            for vector_id in ids or []:
+                rows.pop(vector_id, None)
+
+    def describe_index_stats(self, **kwargs: Any) -> SimpleNamespace:
+        with self._lock:
+            namespaces = {
+                name: SimpleNamespace(vector_count=len(rows))
+                for name, rows in self.namespaces.items() if rows
+            }
+        return SimpleNamespace(
+            dimension=self.dimension,
+            namespaces=namespaces,
+            total_vector_count=sum(ns.vector_count for ns in namespaces.values())
+        )
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple
+import numpy as np
+from config import settings
+from lazy import LazyComponent
+
+logger = logging.getLogger(__name__)
+
+Ranking = List[Tuple[int, float]]
+
+class CrossEncoderReranker:
+    name = "cross_encoder"
+
+    def __init__(self, model_name: Optional[str] = None):
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name or settings.reranker_model
+        self.model = CrossEncoder(self.model_name, max_length=settings.reranker_max_length, device="cpu")
+
+    def score(self, query: str, passages: List[str]) -> np.ndarray:
+        if not passages:
+            return np.zeros(0, dtype="float32")
+
+        logits = self.model.predict(
+            [(query, passage) for passage in passages],
+            batch_size=settings.reranker_batch_size,
+            activation_fct=lambda x: x,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return calibrate(np.asarray(logits, dtype="float32").reshape(len(passages)))
+
+    def rank(self, query: str, passages: List[str], top_k: Optional[int] = None) -> Ranking:
+        scores = self.score(query, passages)
+        order = np.argsort(-scores, kind="stable")[:top_k or settings.reranker_top_k]
+        return [(int(i), float(scores[i])) for i in order]
+
+    async def arank(self, query: str, passages: List[str], top_k: Optional[int] = None) -> Ranking:
+        return await asyncio.to_thread(self.rank, query, passages, top_k)
+
+class LLMReranker:
+    name = "llm"
+
+    def __init__(self, predict: Callable[[str], Awaitable[str]]):
+        self.predict = predict
+
+    async def arank(self, query: str, passages: List[str], top_k: Optional[int] = None) -> Ranking:
+        top_k = top_k or settings.reranker_top_k
+        prompt = f"""
+        Given the legal query: "{query}"
+
+        Rank these findings by relevance and legal authority:
+        {[passage[:200] for passage in passages]}
+
+        Return only the indices of the top {top_k} most relevant findings.
+        Format: {list(range(top_k))}
+        """
+
+        response = await self.predict(prompt)
+        indices = parse_indices(response, len(passages))[:top_k]
+        return [(i, 1.0 - rank / max(len(indices), 1)) for rank, i in enumerate(indices)]
+
+def calibrate(logits: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-(settings.reranker_scale * logits + settings.reranker_bias)))
+
+def parse_indices(response: str, size: int) -> List[int]:
+    match = re.search(r"\[[\d,\s]*\]", response)
+    if match is None:
+        raise ValueError(f"No index list in ranking response: {response[:100]!r}")
+
+    indices = []
+    for i in json.loads(match.group(0)):
+        if 0 <= i < size and i not in indices:
+            indices.append(i)
+    return indices
+
+cross_encoder_reranker = LazyComponent("reranker", CrossEncoderReranker)
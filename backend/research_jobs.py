@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from config import settings
+from llm_governor import request_priority
+from models import AgentResponse, LegalQuery
+from orchestrator import orchestrator
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+class ResearchJobStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS research_jobs ("
+            "id TEXT PRIMARY KEY, priority INTEGER NOT NULL, status TEXT NOT NULL, "
+            "query TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS research_jobs_pending ON research_jobs (status, priority DESC, created_at)"
+        )
+        self._conn.commit()
+
+    def insert(self, query: LegalQuery, priority: int) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO research_jobs (id, priority, status, query, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, priority, json.dumps(jsonable_encoder(query)), time.time())
+            )
+            self._conn.commit()
+        return job_id
+
+    def claim(self) -> Optional[sqlite3.Row]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM research_jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "UPDATE research_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), row["id"])
+            )
+            self._conn.commit()
+            return row
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]], error: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE research_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def requeue_interrupted(self, max_attempts: int) -> Tuple[int, int]:
+        with self._lock:
+            failed = self._conn.execute(
+                "UPDATE research_jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE status = 'running' AND attempts >= ?",
+                (f"Interrupted {max_attempts} times; giving up", time.time(), max_attempts)
+            ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE research_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+            self._conn.commit()
+            return requeued, failed
+
+    def prune(self, retention: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM research_jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (time.time() - retention,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute("SELECT * FROM research_jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def position(self, row: sqlite3.Row) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM research_jobs WHERE status = 'queued' AND "
+                "(priority > ? OR (priority = ? AND created_at < ?))",
+                (row["priority"], row["priority"], row["created_at"])
+            ).fetchone()[0]
+
+    def recent(self, limit: int) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT * FROM research_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                status: count
+                for status, count in self._conn.execute("SELECT status, COUNT(*) FROM research_jobs GROUP BY status")
+            }
+
+def job_to_dict(row: sqlite3.Row, position: Optional[int] = None) -> Dict[str, Any]:
+    priority = {value: name for name, value in PRIORITIES.items()}.get(row["priority"], row["priority"])
+    job = {
+        "job_id": row["id"],
+        "status": row["status"],
+        "priority": priority,
+        "query": json.loads(row["query"]),
+        "error": row["error"],
+        "attempts": row["attempts"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"]
+    }
+    if position is not None:
+        job["queue_position"] = position
+    return job
+
+class ResearchJobQueue:
+    def __init__(self):
+        self.store: Optional[ResearchJobStore] = None
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def startup(self):
+        if self.store is not None:
+            return
+
+        self.store = await asyncio.to_thread(ResearchJobStore, settings.research_jobs_path)
+        requeued, failed = await asyncio.to_thread(self.store.requeue_interrupted, settings.research_max_attempts)
+        if requeued:
+            logger.info(f"Requeued {requeued} research jobs interrupted by a restart")
+        if failed:
+            logger.warning(f"Failed {failed} research jobs interrupted {settings.research_max_attempts} times")
+
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._workers = [
+            asyncio.ensure_future(self._run())
+            for _ in range(settings.research_workers)
+        ]
+
+    async def shutdown(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.store = None
+
+    async def submit(self, query: LegalQuery, priority: str = "normal") -> Dict[str, Any]:
+        await self.startup()
+        job_id = await asyncio.to_thread(self.store.insert, query, PRIORITIES[priority])
+        self._wakeup.set()
+        await asyncio.to_thread(self.store.prune, settings.research_job_retention)
+        return await self.get_job(job_id)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        await self.startup()
+        row = await asyncio.to_thread(self.store.get, job_id)
+        if row is None:
+            return None
+
+        position = await asyncio.to_thread(self.store.position, row) if row["status"] == "queued" else None
+        return job_to_dict(row, position)
+
+    async def get_result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        await self.startup()
+        row = await asyncio.to_thread(self.store.get, job_id)
+        if row is None or row["result"] is None:
+            return None
+        return json.loads(row["result"])
+
+    async def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        await self.startup()
+        return [job_to_dict(row) for row in await asyncio.to_thread(self.store.recent, limit)]
+
+    async def get_stats(self) -> Dict[str, Any]:
+        if self.store is None:
+            return {"workers": 0}
+        return {
+            "workers": len(self._workers),
+            **await asyncio.to_thread(self.store.counts)
+        }
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            row = await asyncio.to_thread(self.store.claim)
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.research_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._process(row)
+
+    async def _process(self, row: sqlite3.Row):
+        request_priority.set("batch")
+        try:
+            query = LegalQuery(**json.loads(row["query"]))
+            response = await orchestrator.research(query)
+            status = "completed" if response.success else "failed"
+            result, error = jsonable_encoder(response), response.error
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Research job {row['id']} failed: {str(e)}")
+            status, error = "failed", str(e)
+            result = jsonable_encoder(AgentResponse(success=False, error=error, processing_time=0))
+
+        await asyncio.to_thread(self.store.finish, row["id"], status, result, error)
+
+research_job_queue = ResearchJobQueue()
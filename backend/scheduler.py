@@ -0,0 +1,178 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from config import settings
+
+request_limiter: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("request_limiter", default=None)
+
+class _Slot:
+    def __init__(self, limiter: asyncio.Semaphore):
+        self.limiter = limiter
+        self.held = False
+
+_current_slot: ContextVar[Optional[_Slot]] = ContextVar("current_slot", default=None)
+
+def new_request_limiter(max_concurrency: Optional[int] = None) -> asyncio.Semaphore:
+    return asyncio.Semaphore(max_concurrency or settings.scheduler_max_concurrency)
+
+class StageError(Exception):
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+class StageNode:
+    def __init__(self, name: str, func: Callable[..., Awaitable[Any]], deps: List[str]):
+        self.name = name
+        self.func = func
+        self.deps = deps
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+class StageScheduler:
+    def __init__(self, max_concurrency: Optional[int] = None, on_complete: Optional[Callable[[str, Any], None]] = None):
+        self.max_concurrency = max_concurrency or settings.scheduler_max_concurrency
+        self.on_complete = on_complete
+        self.nodes: Dict[str, StageNode] = {}
+        self.results: Dict[str, Any] = {}
+        self._origin = 0.0
+
+    def add(self, name: str, func: Callable[..., Awaitable[Any]], deps: Optional[List[str]] = None) -> "StageScheduler":
+        if name in self.nodes:
+            raise ValueError(f"Duplicate stage: {name}")
+
+        self.nodes[name] = StageNode(name, func, list(deps or []))
+        return self
+
+    def _validate(self):
+        for node in self.nodes.values():
+            for dep in node.deps:
+                if dep not in self.nodes:
+                    raise ValueError(f"Stage '{node.name}' depends on unknown stage '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    async def _run_node(self, node: StageNode, limiter: asyncio.Semaphore) -> Any:
+        slot = _Slot(limiter)
+        await limiter.acquire()
+        slot.held = True
+        _current_slot.set(slot)
+        try:
+            node.started_at = time.time()
+            return await node.func(*[self.results[dep] for dep in node.deps])
+        finally:
+            node.finished_at = time.time()
+            if slot.held:
+                limiter.release()
+
+    async def run(self) -> Dict[str, Any]:
+        self._validate()
+        self._origin = time.time()
+
+        limiter = request_limiter.get()
+        token = None
+        if limiter is None:
+            limiter = new_request_limiter(self.max_concurrency)
+            token = request_limiter.set(limiter)
+
+        # A stage that runs a nested scheduler lends its slot to its sub-stages while it waits on them.
+        parent = _current_slot.get()
+        if parent is not None and parent.held:
+            parent.limiter.release()
+            parent.held = False
+
+        try:
+            return await self._run_stages(limiter)
+        finally:
+            if token is not None:
+                request_limiter.reset(token)
+            if parent is not None and not parent.held:
+                await parent.limiter.acquire()
+                parent.held = True
+
+    async def _run_stages(self, limiter: asyncio.Semaphore) -> Dict[str, Any]:
+        pending = dict(self.nodes)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                ready = [
+                    name for name, node in pending.items()
+                    if all(dep in self.results for dep in node.deps)
+                ]
+                for name in ready:
+                    node = pending.pop(name)
+                    running[asyncio.ensure_future(self._run_node(node, limiter))] = name
+
+                if not running:
+                    raise ValueError("No runnable stages remain")
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    self.results[name] = task.result()
+                    if self.on_complete:
+                        self.on_complete(name, self.results[name])
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        return self.results
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "start": node.started_at - self._origin,
+                "end": node.finished_at - self._origin,
+                "duration": node.finished_at - node.started_at
+            }
+            for name, node in self.nodes.items()
+            if node.started_at is not None and node.finished_at is not None
+        }
+
+    def critical_path(self) -> List[str]:
+        finished = {
+            name: node for name, node in self.nodes.items()
+            if node.finished_at is not None
+        }
+        if not finished:
+            return []
+
+        current = max(finished.values(), key=lambda n: n.finished_at)
+        path = [current.name]
+
+        while current.deps:
+            current = max(
+                (self.nodes[dep] for dep in current.deps),
+                key=lambda n: n.finished_at or 0.0
+            )
+            path.append(current.name)
+
+        return list(reversed(path))
+
+    def report(self) -> Dict[str, Any]:
+        timings = self.timings()
+        path = self.critical_path()
+
+        return {
+            "stages": timings,
+            "critical_path": path,
+            "critical_path_time": sum(timings[name]["duration"] for name in path if name in timings),
+            "wall_time": max((t["end"] for t in timings.values()), default=0.0)
+        }
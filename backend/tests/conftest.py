@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="legal-research-tests-")
+
+os.environ.update({
+    "LLM_PROVIDER": "local",
+    "EMBEDDING_PROVIDER": "local",
+    "RERANKER_BACKEND": "llm",
+    "VECTOR_STORE_DIR": os.path.join(DATA_DIR, "store"),
+    "INGESTION_SPOOL_DIR": os.path.join(DATA_DIR, "spool"),
+    "RESEARCH_JOBS_PATH": os.path.join(DATA_DIR, "research_jobs.sqlite"),
+    "SEARCH_CACHE_PATH": "",
+    "LLM_CACHE_PATH": "",
+    "LLM_CACHE_ENABLED": "false",
+    "UPSTREAM_HTTP2": "false",
+    "AGENT_STEP_BACKOFF": "0"
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import pytest
+from legal_apis import legal_api_manager
+from vector_store import vector_store
+
+CASES = {
+    "courtlistener": [{
+        "caseName": "Harlow v. Fitzgerald",
+        "citation": "457 U.S. 800",
+        "court": "Supreme Court",
+        "dateFiled": "1982-06-24",
+        "jurisdiction": "federal",
+        "score": 0.9,
+        "absolute_url": "/opinion/110766/harlow-v-fitzgerald/"
+    }],
+    "harvard": [{
+        "name": "Pearson v. Callahan",
+        "citations": ["555 U.S. 223"],
+        "court_name": "Supreme Court",
+        "decision_date": "2009-01-21",
+        "jurisdiction": "federal",
+        "score": 0.8,
+        "url": "https://api.case.law/v1/cases/pearson/"
+    }]
+}
+
+DOCUMENTS = [
+    (
+        "Qualified immunity shields government officials performing discretionary functions from civil "
+        "damages liability unless their conduct violates clearly established statutory or constitutional rights.",
+        {"jurisdiction": "federal", "court": "Supreme Court", "date": "1982-06-24", "case_name": "Harlow v. Fitzgerald"}
+    ),
+    (
+        "A claim under 42 U.S.C. 1983 requires a deprivation of a federal right by a person acting under color of state law.",
+        {"jurisdiction": "federal", "court": "Supreme Court", "date": "1988-06-20", "case_name": "West v. Atkins"}
+    ),
+    (
+        "Excessive force claims arising from an arrest are analyzed under the Fourth Amendment reasonableness standard.",
+        {"jurisdiction": "federal", "court": "Supreme Court", "date": "1989-05-15", "case_name": "Graham v. Connor"}
+    )
+]
+
+@pytest.fixture(scope="session")
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+@pytest.fixture(scope="session")
+def upstream(run):
+    def handler(request: httpx.Request) -> httpx.Response:
+        source = "courtlistener" if "courtlistener" in str(request.url) else "harvard"
+        return httpx.Response(200, json={"results": CASES[source]})
+
+    for source in legal_api_manager.sources:
+        source.client = httpx.AsyncClient(base_url=source.base_url, transport=httpx.MockTransport(handler))
+    yield legal_api_manager
+    run(legal_api_manager.shutdown())
+
+@pytest.fixture(scope="session")
+def indexed_store():
+    store = vector_store.resolve()
+    store.add_documents([text for text, _ in DOCUMENTS], [meta for _, meta in DOCUMENTS])
+    return store
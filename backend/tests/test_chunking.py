@@ -0,0 +1,58 @@
+from chunking import _split_long, iter_passages
+from config import settings
+from embeddings import embedding_service
+from tokens import count_tokens
+from vector_store import VectorStore
+
+LONG_SENTENCE = " ".join(
+    f"the officer's conduct in incident-{i} violated clearly-established constitutional rights"
+    for i in range(60)
+)
+CITATIONS = " ".join(
+    f"See Harlow v. Fitzgerald, 457 U.S. 800, 818-19 (1982); Pearson v. Callahan, 555 U.S. 223, {i} (2009)"
+    for i in range(80)
+)
+
+def _llm_count(text: str) -> int:
+    return count_tokens(text, settings.llm_model)
+
+def test_split_long_pieces_fit_token_budget():
+    pieces = list(_split_long(LONG_SENTENCE, 0, len(LONG_SENTENCE), 25, _llm_count))
+
+    assert len(pieces) > 1
+    assert all(_llm_count(LONG_SENTENCE[start:end]) <= 25 for start, end in pieces)
+    assert " ".join(LONG_SENTENCE[start:end] for start, end in pieces).split() == LONG_SENTENCE.split()
+
+def test_unbroken_text_is_split_within_budget():
+    text = "x" * 1000
+    pieces = list(_split_long(text, 0, len(text), 30, _llm_count))
+
+    assert "".join(text[start:end] for start, end in pieces) == text
+    assert all(_llm_count(text[start:end]) <= 30 for start, end in pieces)
+
+def test_passages_stay_within_chunk_max_tokens():
+    passages = list(iter_passages(LONG_SENTENCE + ". Short closing sentence.", max_tokens=40, overlap_tokens=10))
+
+    assert len(passages) > 1
+    assert all(_llm_count(passage["text"]) <= 40 for passage in passages)
+
+def test_passages_are_counted_with_the_given_tokenizer():
+    count = embedding_service.resolve().count_tokens
+    passages = list(iter_passages(CITATIONS, max_tokens=120, overlap_tokens=20, count=count))
+
+    assert len(passages) > 1
+    assert all(count(passage["text"]) <= 120 for passage in passages)
+
+def test_store_clamps_chunks_to_embedder_limit(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(settings, "vector_store_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "chunk_max_tokens", 1000)
+    store = VectorStore()
+    limit = store.embedder.max_input_tokens()
+
+    store.add_documents([CITATIONS], [{"jurisdiction": "federal", "case_name": "Citations"}])
+
+    passages = [meta["content"] for batch in store.metadata_store.iter_documents() for _, meta in batch]
+    assert "exceeds what" in caplog.text
+    assert len(passages) > 1
+    assert all(store.embedder.count_tokens(passage) <= limit for passage in passages)
+    assert limit == store.embedder.max_seq_length - 2
@@ -0,0 +1,35 @@
+import asyncio
+from contextvars import ContextVar
+from coalescing import SingleFlight
+from llm_governor import current_priority, request_priority
+
+marker: ContextVar[str] = ContextVar("marker", default="unset")
+
+def test_flight_runs_in_fresh_context_at_most_urgent_priority(run):
+    flight = SingleFlight()
+    release = asyncio.Event()
+    seen = {}
+
+    async def work():
+        seen["marker"] = marker.get()
+        seen["initial"] = current_priority()
+        await release.wait()
+        seen["final"] = current_priority()
+        return "brief"
+
+    async def caller(priority: str):
+        request_priority.set(priority)
+        marker.set(priority)
+        return await flight.do("key", work)
+
+    async def scenario():
+        leader = asyncio.ensure_future(caller("batch"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(caller("interactive"))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(leader, follower)
+
+    assert run(scenario()) == ["brief", "brief"]
+    assert seen == {"marker": "unset", "initial": "batch", "final": "interactive"}
+    assert flight.get_stats()["followers"] == 1
@@ -0,0 +1,56 @@
+from datetime import datetime
+import pytest
+from agents.composer_agent import ComposerAgent
+from models import Citation, LegalBrief
+from validators import ValidationError
+
+BRIEF = LegalBrief(
+    query="qualified immunity for excessive force",
+    executive_summary="Officials are immune unless they violate clearly established law.",
+    key_findings=["Qualified immunity is an affirmative defense."],
+    supporting_cases=[Citation(
+        case_name="Harlow v. Fitzgerald",
+        citation="457 U.S. 800",
+        court="Supreme Court",
+        date=datetime(1982, 6, 24),
+        jurisdiction="federal",
+        relevance_score=0.9
+    )],
+    legal_analysis="The doctrine balances accountability against the burdens of litigation.",
+    conclusions=["The defense likely applies."],
+    jurisdiction_analysis={},
+    generated_at=datetime(2024, 1, 1)
+)
+
+GOOD = "LEGAL BRIEF\n\n" + "Under Harlow v. Fitzgerald, officials are shielded from damages liability. " * 5
+BAD = "LEGAL BRIEF\n\n" + "Officials are shielded from damages liability in many circumstances. " * 5
+
+def _streaming_agent(replies):
+    agent = ComposerAgent()
+    calls = []
+
+    async def stream_predict(prompt, on_token, step="predict"):
+        reply = replies[len(calls)]
+        calls.append(step)
+        on_token(reply)
+        return reply
+
+    agent.stream_predict = stream_predict
+    return agent, calls
+
+def test_streamed_brief_is_validated_and_retried(run):
+    agent, calls = _streaming_agent([BAD, GOOD])
+    tokens, resets = [], []
+
+    brief = run(agent._format_brief(BRIEF, tokens.append, lambda: resets.append(len(tokens))))
+
+    assert brief == GOOD
+    assert calls == ["format_brief", "format_brief"]
+    assert resets == [1]
+    assert tokens == [BAD, GOOD]
+
+def test_streamed_brief_fails_when_every_attempt_is_invalid(run):
+    agent, calls = _streaming_agent([BAD] * 10)
+
+    with pytest.raises(ValidationError, match="supporting cases"):
+        run(agent._format_brief(BRIEF, lambda token: None))
@@ -0,0 +1,16 @@
+import os
+import pytest
+from config import settings
+from ingestion import IngestionManager
+
+def test_submit_stream_removes_partial_spool_on_read_error(run):
+    async def body():
+        yield b'{"content": "Qualified immunity shields officials."}\n'
+        raise ConnectionError("client disconnected")
+
+    manager = IngestionManager()
+    with pytest.raises(ConnectionError):
+        run(manager.submit_stream(body()))
+
+    assert manager.jobs == {}
+    assert not os.listdir(settings.ingestion_spool_dir)
@@ -0,0 +1,146 @@
+import pytest
+from config import settings
+from conftest import DOCUMENTS
+from embeddings import embedding_service
+from pinecone_index import (
+    PINECONE_MAX_METADATA_BYTES,
+    PINECONE_MAX_VECTORS_PER_UPSERT,
+    InMemoryPineconeIndex,
+    PineconeUpserter,
+    metadata_bytes,
+    upsert_batches,
+    vector_bytes
+)
+from vector_store import VectorStore
+
+STATE_DOCUMENTS = [
+    (
+        "California applies a negligence standard to claims against public entities under the Government Claims Act.",
+        {"jurisdiction": "california", "court": "Supreme Court of California", "date": "2004-03-01", "case_name": "Doe v. State"}
+    ),
+    (
+        "New York courts require notice of claim within ninety days for tort actions against municipalities.",
+        {"jurisdiction": "new york", "court": "Court of Appeals", "date": "2008-11-20", "case_name": "Roe v. City"}
+    )
+]
+
+class FlakyIndex(InMemoryPineconeIndex):
+    def __init__(self, dimension: int, failures: int):
+        super().__init__(dimension)
+        self.failures = failures
+
+    def upsert(self, vectors, namespace="", **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("503 Service Unavailable")
+        return super().upsert(vectors, namespace=namespace, **kwargs)
+
+class RecordingIndex(InMemoryPineconeIndex):
+    def __init__(self, dimension: int):
+        super().__init__(dimension)
+        self.queried = []
+
+    def query(self, *args, namespace="", **kwargs):
+        self.queried.append(namespace)
+        return super().query(*args, namespace=namespace, **kwargs)
+
+def _store(index_type=InMemoryPineconeIndex) -> VectorStore:
+    return VectorStore(use_pinecone=True, pinecone_index=index_type(embedding_service.resolve().dimension))
+
+def _add(store: VectorStore, documents):
+    store.add_documents([text for text, _ in documents], [dict(meta) for _, meta in documents])
+
+def _vector(i: int, dimension: int = 8, content: str = "text"):
+    return (f"doc-{i}", [0.1] * dimension, {"content": content})
+
+@pytest.mark.parametrize("chunking", [True, False])
+def test_reingesting_document_overwrites_vectors(monkeypatch, chunking):
+    monkeypatch.setattr(settings, "chunking_enabled", chunking)
+    store = _store()
+
+    _add(store, DOCUMENTS)
+    first = store.index.describe_index_stats().total_vector_count
+    _add(store, DOCUMENTS)
+
+    assert first >= len(DOCUMENTS)
+    assert store.index.describe_index_stats().total_vector_count == first
+
+def test_upsert_batches_respect_count_and_byte_limits():
+    vectors = [_vector(i) for i in range(2500)]
+    batches = list(upsert_batches(vectors))
+    assert all(len(batch) <= PINECONE_MAX_VECTORS_PER_UPSERT for batch in batches)
+    assert [vector for batch in batches for vector in batch] == vectors
+
+    large = [_vector(i, content="x" * 30000) for i in range(40)]
+    max_bytes = 200_000
+    batches = list(upsert_batches(large, max_vectors=1000, max_bytes=max_bytes))
+    assert len(batches) > 1
+    assert all(sum(vector_bytes(vector) for vector in batch) <= max_bytes for batch in batches)
+    assert [vector for batch in batches for vector in batch] == large
+
+def test_index_rejects_metadata_over_limit():
+    index = InMemoryPineconeIndex(8)
+    with pytest.raises(ValueError):
+        index.upsert([_vector(0, content="x" * PINECONE_MAX_METADATA_BYTES)])
+
+def test_unchunked_documents_fit_metadata_limit(monkeypatch):
+    monkeypatch.setattr(settings, "chunking_enabled", False)
+    store = _store()
+    text = "Qualified immunity protects officials from suit. " * 2000
+
+    _add(store, [(text, {"jurisdiction": "federal", "case_name": "Long Opinion"})])
+
+    rows = next(iter(store.index.namespaces.values()))
+    (_, meta), = rows.values()
+    assert metadata_bytes(meta) <= PINECONE_MAX_METADATA_BYTES
+    assert meta["content_truncated"] is True
+    assert text.startswith(meta["content"])
+
+def test_jurisdiction_filter_routes_to_one_namespace():
+    store = _store(RecordingIndex)
+    _add(store, DOCUMENTS + STATE_DOCUMENTS)
+    query = store.embed(["government claims act negligence"])
+
+    results = store.search_by_vector(query, k=10, filters={"jurisdiction": "california"})
+    assert store.index.queried == ["california"]
+    assert {hit["metadata"]["jurisdiction"] for hit in results} == {"california"}
+
+    store.index.queried.clear()
+    results = store.search_by_vector(query, k=10)
+    assert sorted(store.index.queried) == ["california", "federal", "new-york"]
+    assert {hit["metadata"]["jurisdiction"] for hit in results} == {"federal", "california", "new york"}
+    assert [hit["score"] for hit in results] == sorted((hit["score"] for hit in results), reverse=True)
+
+def test_transient_upsert_failure_is_retried(monkeypatch):
+    monkeypatch.setattr(settings, "pinecone_upsert_backoff", 0)
+    index = FlakyIndex(8, failures=2)
+    upserter = PineconeUpserter(index, concurrency=1, retries=3)
+
+    assert upserter.upsert({"federal": [_vector(i) for i in range(5)]}) == 5
+    assert upserter.get_stats() == {"upserted": 5, "batches": 1, "retried": 2}
+    assert index.describe_index_stats().total_vector_count == 5
+
+def test_persistent_upsert_failure_is_raised(monkeypatch):
+    monkeypatch.setattr(settings, "pinecone_upsert_backoff", 0)
+    upserter = PineconeUpserter(FlakyIndex(8, failures=5), concurrency=1, retries=1)
+
+    with pytest.raises(ConnectionError):
+        upserter.upsert({"federal": [_vector(0)]})
+
+@pytest.mark.parametrize("by_namespace", [True, False])
+def test_filters_match_case_insensitively(monkeypatch, by_namespace):
+    monkeypatch.setattr(settings, "pinecone_namespace_by_jurisdiction", by_namespace)
+    store = _store()
+    _add(store, DOCUMENTS + STATE_DOCUMENTS)
+    query = store.embed(["notice of claim"])
+
+    results = store.search_by_vector(query, k=10, filters={"jurisdiction": "New York"})
+    assert [hit["metadata"]["case_name"] for hit in results] == ["Roe v. City"]
+
+    results = store.search_by_vector(query, k=10, filters={"jurisdiction": "NEW YORK", "court": "court of appeals"})
+    assert [hit["metadata"]["case_name"] for hit in results] == ["Roe v. City"]
+
+def test_namespace_routing_drops_jurisdiction_clause():
+    store = _store()
+    assert store._pinecone_filter({"jurisdiction": "New York"}) is None
+    assert store._pinecone_filter({"court": " Court of  Appeals"}) == {"court_key": {"$eq": "court of appeals"}}
@@ -0,0 +1,64 @@
+from models import LegalQuery
+from metrics import render_metrics
+from orchestrator import orchestrator
+
+AGENTS = {"Retriever", "Analyzer", "Summarizer", "Composer"}
+
+def test_process_legal_query_reports_request_metrics(run, upstream, indexed_store):
+    response = run(orchestrator.process_legal_query(LegalQuery(query="qualified immunity for excessive force")))
+
+    assert response.success, response.error
+    metrics = response.metrics
+
+    llm = metrics["llm"]
+    assert llm["calls"] > 0
+    assert llm["prompt_tokens"] > 0
+    assert llm["completion_tokens"] > 0
+    assert llm["cost_usd"] > 0
+    assert {"Analyzer.analyze_findings", "Summarizer.executive_summary", "Composer.format_brief"} <= set(llm["steps"])
+    assert sum(step["calls"] for step in llm["steps"].values()) == llm["calls"]
+
+    assert metrics["upstream"]["calls"] == len(upstream.sources)
+    assert metrics["upstream"]["errors"] == 0
+    assert metrics["embeddings"]["texts"] >= 1
+    assert metrics["vector_search"]["calls"] >= 1
+    assert set(metrics["agents"]) == AGENTS
+    assert all(agent["success"] for agent in metrics["agents"].values())
+
+def test_render_metrics_exposes_prometheus_series(run, upstream, indexed_store):
+    response = run(orchestrator.process_legal_query(LegalQuery(query="section 1983 color of state law")))
+    assert response.success, response.error
+
+    exposition = render_metrics().decode()
+    for histogram in (
+        "legal_llm_request_seconds",
+        "legal_upstream_request_seconds",
+        "legal_embedding_batch_seconds",
+        "legal_vector_search_seconds",
+        "legal_pipeline_stage_seconds"
+    ):
+        assert f"{histogram}_bucket" in exposition
+        assert f"{histogram}_count" in exposition
+
+    for counter in (
+        "legal_llm_tokens_total",
+        "legal_llm_cost_usd_total",
+        "legal_embedding_texts_total",
+        "legal_search_cache_requests_total",
+        "legal_research_requests_total"
+    ):
+        assert f"{counter}{{" in exposition
+
+    assert 'legal_research_requests_total{outcome="success"}' in exposition
+
+def test_stream_legal_query_streams_validated_brief(run, upstream, indexed_store):
+    async def collect():
+        return [event async for event in orchestrator.stream_legal_query(LegalQuery(query="qualified immunity defense"))]
+
+    events = run(collect())
+    names = [event["event"] for event in events]
+
+    assert names[0] == "started"
+    assert names[-1] == "done", events[-1]
+    assert "token" in names
+    assert "composition" in names
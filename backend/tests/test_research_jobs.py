@@ -0,0 +1,21 @@
+import os
+from conftest import DATA_DIR
+from models import LegalQuery
+from research_jobs import ResearchJobStore
+
+def test_requeue_interrupted_fails_jobs_at_max_attempts():
+    store = ResearchJobStore(os.path.join(DATA_DIR, "requeue.sqlite"))
+    first = store.insert(LegalQuery(query="qualified immunity"), 1)
+    second = store.insert(LegalQuery(query="section 1983 claims"), 1)
+
+    store.claim()
+    store.claim()
+    assert store.requeue_interrupted(max_attempts=2) == (2, 0)
+
+    assert store.claim()["id"] == first
+    assert store.requeue_interrupted(max_attempts=2) == (0, 1)
+
+    assert store.get(first)["status"] == "failed"
+    assert store.get(first)["attempts"] == 2
+    assert store.get(first)["error"]
+    assert store.get(second)["status"] == "queued"
@@ -0,0 +1,23 @@
+from agents.retriever_agent import RetrieverAgent
+from config import settings
+
+QUERY = "qualified immunity"
+
+def _hit(content, score, dense_score=None, lexical_score=None):
+    return {"content": content, "score": score, "dense_score": dense_score, "lexical_score": lexical_score, "metadata": {}}
+
+def test_dense_hits_use_score_threshold():
+    agent = RetrieverAgent()
+    above = settings.vector_score_threshold + 0.1
+    below = settings.vector_score_threshold - 0.1
+
+    assert agent._is_relevant({"content": "x", "score": above, "metadata": {}}, QUERY)
+    assert not agent._is_relevant({"content": "x", "score": below, "metadata": {}}, QUERY)
+    assert agent._is_relevant(_hit("x", 0.4, dense_score=above, lexical_score=3.0), QUERY)
+
+def test_lexical_only_hits_need_full_phrase():
+    agent = RetrieverAgent()
+
+    assert agent._is_relevant(_hit("Officials enjoy Qualified  Immunity, unless...", 0.5, lexical_score=2.0), QUERY)
+    assert not agent._is_relevant(_hit("Immunity was not qualified by statute.", 0.5, lexical_score=2.0), QUERY)
+    assert not agent._is_relevant(_hit("The qualified immunity doctrine", 0.5, dense_score=0.1), QUERY)
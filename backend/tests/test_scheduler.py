@@ -0,0 +1,45 @@
+import asyncio
+from scheduler import StageScheduler, new_request_limiter, request_limiter
+
+def _tracked(state):
+    async def step():
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return True
+    return step
+
+def _nested(state, width):
+    async def stage():
+        scheduler = StageScheduler()
+        for i in range(width):
+            scheduler.add(f"leaf-{i}", _tracked(state))
+        return await scheduler.run()
+    return stage
+
+def test_nested_schedulers_share_request_limit(run):
+    state = {"running": 0, "peak": 0}
+
+    async def request():
+        request_limiter.set(new_request_limiter(3))
+        scheduler = StageScheduler(max_concurrency=3)
+        for i in range(4):
+            scheduler.add(f"outer-{i}", _nested(state, 4))
+        return await scheduler.run()
+
+    results = run(asyncio.wait_for(request(), 5))
+
+    assert len(results) == 4
+    assert state["peak"] == 3
+
+def test_standalone_scheduler_limits_nested_stages(run):
+    state = {"running": 0, "peak": 0}
+    scheduler = StageScheduler(max_concurrency=2)
+    scheduler.add("a", _nested(state, 3))
+    scheduler.add("b", _nested(state, 3))
+
+    run(asyncio.wait_for(scheduler.run(), 5))
+
+    assert state["peak"] == 2
+    assert request_limiter.get() is None
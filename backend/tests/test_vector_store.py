@@ -0,0 +1,148 @@
+import os
+import numpy as np
+import pytest
+from config import settings
+from metadata_store import MetadataStore
+from vector_store import VectorStore
+
+DOCUMENTS = [
+    f"Opinion {i} addresses qualified immunity, excessive force and section 1983 liability in district {i % 7}."
+    for i in range(40)
+]
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_store_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "chunking_enabled", False)
+    return tmp_path
+
+def _metadata(count):
+    return [{"jurisdiction": "federal", "case_name": f"Case {i}"} for i in range(count)]
+
+def test_failed_add_rolls_back_wal_and_metadata(store_dir, monkeypatch):
+    store = VectorStore()
+    store.add_documents(DOCUMENTS[:5], _metadata(5))
+    wal_size = store.wal.size()
+
+    def fail(embeddings):
+        raise RuntimeError("index add failed")
+
+    monkeypatch.setattr(store, "_add_to_delta", fail)
+    with pytest.raises(RuntimeError):
+        store.add_documents(DOCUMENTS[5:10], _metadata(5))
+
+    assert len(store.metadata_store) == 5
+    assert store.wal.size() == wal_size
+    assert store.wal.pending_vectors == 5
+
+    reopened = VectorStore()
+    assert reopened._vector_count() == len(reopened.metadata_store) == 5
+
+def test_wal_replay_never_trains_the_index(store_dir, monkeypatch):
+    monkeypatch.setattr(settings, "faiss_index_type", "ivfpq")
+    store = VectorStore()
+    embeddings = store.embed(DOCUMENTS[:10])
+    store.wal.append(0, embeddings, _metadata(10))
+    store.metadata_store.add(0, _metadata(10))
+
+    reopened = VectorStore()
+
+    assert not reopened.index.is_trained
+    assert reopened._vector_count() == 10
+    assert len(reopened.search_by_vector(reopened.embed(["qualified immunity"]), k=5)) == 5
+
+def test_checkpoint_never_exposes_duplicate_vectors(store_dir):
+    store = VectorStore()
+    store.add_documents(DOCUMENTS[:20], _metadata(20))
+    query = store.embed(["excessive force in district 3"])
+    before = [hit["metadata"]["case_name"] for hit in store.search_by_vector(query, k=10)]
+    during = []
+
+    save = store._save_local_index
+
+    def save_and_search(index=None):
+        during.append([hit["metadata"]["case_name"] for hit in store.search_by_vector(query, k=10)])
+        save(index)
+
+    store._save_local_index = save_and_search
+    store.checkpoint()
+
+    assert during == [before]
+    assert store.delta_index is None
+    assert [hit["metadata"]["case_name"] for hit in store.search_by_vector(query, k=10)] == before
+    assert os.path.getsize(store._path("vectors.wal")) == 0
+
+def _opinions(count):
+    return [
+        f"Opinion {i} holds that officer {i % 13} used excessive force and that qualified immunity "
+        f"does not bar the section 1983 claim filed in district {i % 7}."
+        for i in range(count)
+    ]
+
+def test_ivfpq_store_ingests_with_default_settings(store_dir, monkeypatch):
+    monkeypatch.setattr(settings, "faiss_index_type", "ivfpq")
+    monkeypatch.setattr(settings, "chunking_enabled", True)
+    documents = _opinions(600)
+
+    store = VectorStore()
+    store.add_documents(documents, _metadata(len(documents)))
+
+    assert store._vector_count() == len(store.metadata_store) == len(documents)
+    assert not store.index.is_trained
+    query = store.embed(["excessive force in district 3"])
+    assert len(store.search_by_vector(query, k=10)) == 10
+
+    reopened = VectorStore()
+    assert reopened._vector_count() == len(documents)
+    assert len(reopened.search_by_vector(query, k=10)) == 10
+
+def test_ivfpq_trains_once_enough_vectors_are_buffered(store_dir, monkeypatch):
+    monkeypatch.setattr(settings, "faiss_index_type", "ivfpq")
+    monkeypatch.setattr(settings, "faiss_ivf_nlist", 4)
+    monkeypatch.setattr(settings, "faiss_pq_m", 8)
+    monkeypatch.setattr(settings, "faiss_pq_nbits", 4)
+    monkeypatch.setattr(settings, "faiss_mmap", False)
+    documents = _opinions(200)
+
+    store = VectorStore()
+    store.add_documents(documents[:100], _metadata(100))
+    assert not store.index.is_trained
+
+    store.add_documents(documents[100:], _metadata(100))
+    assert store.index.is_trained
+    assert store.index.ntotal == 200
+    assert store.delta_index is None
+    assert store.wal.pending_vectors == 0
+
+    reopened = VectorStore()
+    assert reopened.index.is_trained
+    assert reopened._vector_count() == 200
+    assert len(reopened.search_by_vector(reopened.embed(["qualified immunity"]), k=5)) == 5
+
+def test_broad_filters_fall_back_to_post_filtering(store_dir, monkeypatch):
+    store = VectorStore()
+    metadata = [{"jurisdiction": "Federal" if i % 2 else "california", "case_name": f"Case {i}"} for i in range(40)]
+    store.add_documents(DOCUMENTS, metadata)
+    query = store.embed(["qualified immunity in district 3"])
+    filters = {"jurisdiction": "federal"}
+
+    selected = [round(hit["score"], 5) for hit in store.search_by_vector(query, k=5, filters=filters)]
+
+    monkeypatch.setattr(settings, "filter_candidate_max", 3)
+    monkeypatch.setattr(settings, "filter_overfetch", 2)
+    post_filtered = store.search_by_vector(query, k=5, filters=filters)
+
+    assert [round(hit["score"], 5) for hit in post_filtered] == selected
+    assert {hit["metadata"]["jurisdiction"] for hit in post_filtered} == {"Federal"}
+    assert store.search_by_vector(query, k=5, filters={"jurisdiction": "texas"}) == []
+
+def test_court_filter_matches_wildcards_literally(tmp_path):
+    store = MetadataStore(str(tmp_path / "metadata.sqlite"))
+    courts = ["Court of Appeals", "100% Court", "Court_of_Claims", "Court\\Annex"]
+    store.add(0, [{"content": court, "court": court} for court in courts])
+
+    assert store.filter_ids(court="%") == [1]
+    assert store.filter_ids(court="_") == [2]
+    assert store.filter_ids(court="\\") == [3]
+    assert store.filter_ids(court="court of") == [0]
+    assert store.match_ids([0, 1, 2, 3], court="%") == [1]
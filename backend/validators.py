@@ -0,0 +1,75 @@
+from typing import Any, Callable, Iterable, List, Optional
+from models import LegalFinding
+
+Check = Callable[[Any], Optional[str]]
+
+class ValidationError(Exception):
+    def __init__(self, step: str, problems: List[str]):
+        super().__init__(f"{step} failed validation: {'; '.join(problems)}")
+        self.step = step
+        self.problems = problems
+
+def run_checks(value: Any, checks: Iterable[Check]) -> List[str]:
+    return [problem for problem in (check(value) for check in checks) if problem]
+
+def text_length(min_chars: int = 1, max_chars: Optional[int] = None) -> Check:
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, str):
+            return f"expected text, got {type(value).__name__}"
+        length = len(value.strip())
+        if length < min_chars:
+            return f"text is {length} characters, expected at least {min_chars}"
+        if max_chars is not None and length > max_chars:
+            return f"text is {length} characters, expected at most {max_chars}"
+        return None
+    return check
+
+def bullet_list(min_items: int = 1, max_items: Optional[int] = None, min_chars: int = 3) -> Check:
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, list):
+            return f"expected a list of bullets, got {type(value).__name__}"
+        items = [item for item in value if isinstance(item, str) and len(item.strip()) >= min_chars]
+        if len(items) < min_items:
+            return f"{len(items)} usable bullets, expected at least {min_items}"
+        if max_items is not None and len(value) > max_items:
+            return f"{len(value)} bullets, expected at most {max_items}"
+        return None
+    return check
+
+def score_range(low: float = 0.0, high: float = 1.0) -> Check:
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, (int, float)) or not low <= value <= high:
+            return f"score {value!r} outside [{low}, {high}]"
+        return None
+    return check
+
+def field(name: str, *checks: Check) -> Check:
+    def check(value: Any) -> Optional[str]:
+        if not isinstance(value, dict) or name not in value:
+            return f"missing '{name}'"
+        problems = run_checks(value[name], checks)
+        return f"{name}: {'; '.join(problems)}" if problems else None
+    return check
+
+def findings_have_content(findings: Any) -> Optional[str]:
+    if not isinstance(findings, list):
+        return f"expected a list of findings, got {type(findings).__name__}"
+    empty = sum(1 for f in findings if not isinstance(f, LegalFinding) or not f.content.strip())
+    return f"{empty} findings without content" if empty else None
+
+def database_findings_cited(findings: Any) -> Optional[str]:
+    uncited = sum(
+        1 for f in findings or []
+        if isinstance(f, LegalFinding) and f.source == "Legal Database" and not f.citations
+    )
+    return f"{uncited} legal database findings without citations" if uncited else None
+
+def mentions_any(names: List[str]) -> Check:
+    def check(value: Any) -> Optional[str]:
+        if not names or not isinstance(value, str):
+            return None
+        text = value.lower()
+        if any(name.lower() in text for name in names if name):
+            return None
+        return "none of the supporting cases are cited"
+    return check
@@ -1,24 +1,70 @@
+import asyncio
 import numpy as np
 import faiss
-import pickle
+import json
 import os
-from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from config import settings
 import pinecone
 from models import LegalFinding
+from faiss_indexes import build_faiss_index, describe_index, search_parameters, train_index, training_threshold
+from index_storage import VectorWAL, atomic_write_index, atomic_write_json
+from metadata_store import MetadataStore, document_date
+from embeddings import embedding_service
+from lazy import LazyComponent
+from chunking import batched, collapse_hits, document_id, iter_chunks
+from pinecone_index import DEFAULT_NAMESPACE, InMemoryPineconeIndex, PineconeUpserter, clean_metadata, fit_metadata, namespace_for, normalize_value
+from metrics import record_vector_search
+
+logger = logging.getLogger(__name__)
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int) -> List[Tuple[int, float]]:
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    
+    best = len(rankings) / (k + 1)
+    fused = [(doc_id, score / best) for doc_id, score in scores.items()]
+    fused.sort(key=lambda hit: hit[1], reverse=True)
+    return fused
+
+def _date_number(value: Any) -> Optional[int]:
+    normalized = document_date({"date": value})
+    if normalized is None or len(normalized) != 10:
+        return None
+    return int(normalized.replace("-", ""))
 
 class VectorStore:
-    def __init__(self, use_pinecone: bool = False):
+    def __init__(self, use_pinecone: bool = False, pinecone_index: Optional[Any] = None):
         self.use_pinecone = use_pinecone
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.dimension = settings.vector_dimension
+        self.embedder = embedding_service.resolve()
+        self.model_name = self.embedder.model_name
+        self.dimension = self.embedder.dimension
         
-        if use_pinecone and settings.pinecone_api_key:
+        if use_pinecone and pinecone_index is not None:
+            self._attach_pinecone(pinecone_index)
+        elif use_pinecone and settings.pinecone_api_key:
             self._init_pinecone()
         else:
+            self.use_pinecone = False
             self._init_faiss()
     
+    def _attach_pinecone(self, index: Any):
+        self.index = index
+        self.upserter = PineconeUpserter(index)
+        self._namespaces: set = set()
+        self._namespaces_checked: Optional[float] = None
+        self._namespace_lock = threading.Lock()
+        self._query_executor = ThreadPoolExecutor(
+            max_workers=settings.pinecone_upsert_concurrency,
+            thread_name_prefix="pinecone-query"
+        )
+    
     def _init_pinecone(self):
         pinecone.init(
             api_key=settings.pinecone_api_key,
@@ -31,66 +77,535 @@ class VectorStore:
                 dimension=self.dimension,
                 metric='cosine'
             )
+        else:
+            index_dimension = pinecone.describe_index(settings.index_name).dimension
+            if index_dimension != self.dimension:
+                raise ValueError(
+                    f"Pinecone index '{settings.index_name}' has dimension {index_dimension}, "
+                    f"but {self.model_name} produces {self.dimension}-dim embeddings"
+                )
         
-        self.index = pinecone.Index(settings.index_name)
+        self._attach_pinecone(pinecone.Index(settings.index_name))
     
     def _init_faiss(self):
-        self.index = faiss.IndexFlatIP(self.dimension)
-        self.documents = []
-        self.metadata = []
+        os.makedirs(settings.vector_store_dir, exist_ok=True)
+        self.index = build_faiss_index(self.dimension)
+        self.delta_index = None
+        self.metadata_store = MetadataStore(self._path("metadata.sqlite"))
+        self.wal = VectorWAL(self._path("vectors.wal"), self.dimension)
+        self._base_writable = True
+        self._write_lock = threading.RLock()
+        self._index_lock = threading.RLock()
         self._load_local_index()
     
+    def _path(self, filename: str) -> str:
+        return os.path.join(settings.vector_store_dir, filename)
+    
+    def _index_info(self) -> Dict[str, Any]:
+        return {
+            "embedding_model": self.model_name,
+            "dimension": self.dimension,
+            "normalized": True,
+            "metric": "inner_product",
+            "index_type": settings.faiss_index_type
+        }
+    
+    def _read_base_index(self) -> faiss.Index:
+        path = self._path("faiss_index.bin")
+        
+        if settings.faiss_mmap and settings.faiss_index_type == "ivfpq":
+            self._base_writable = False
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        
+        self._base_writable = True
+        return faiss.read_index(path)
+    
     def _load_local_index(self):
-        if os.path.exists("faiss_index.bin") and os.path.exists("metadata.pkl"):
-            self.index = faiss.read_index("faiss_index.bin")
-            with open("metadata.pkl", "rb") as f:
-                self.metadata = pickle.load(f)
+        legacy_metadata = self._path("metadata.pkl")
+        if os.path.exists(legacy_metadata) and len(self.metadata_store) == 0:
+            logger.info(f"Migrating {legacy_metadata} into the SQLite metadata store")
+            self.metadata_store.import_pickle(legacy_metadata)
+            os.replace(legacy_metadata, f"{legacy_metadata}.migrated")
+        
+        if os.path.exists(self._path("faiss_index.bin")):
+            self.index = self._read_base_index()
+            
+            stored_info = None
+            if os.path.exists(self._path("index_meta.json")):
+                with open(self._path("index_meta.json")) as f:
+                    stored_info = json.load(f)
+            
+            if stored_info != self._index_info() or self.index.d != self.dimension:
+                logger.warning(
+                    f"Stored index was built with {stored_info or 'unknown settings'}; "
+                    f"re-embedding {len(self.metadata_store)} documents with {self.model_name}"
+                )
+                self._replay_wal(metadata_only=True)
+                self.reembed()
+                return
+        
+        self._replay_wal()
+    
+    def _vector_count(self) -> int:
+        return self.index.ntotal + (self.delta_index.ntotal if self.delta_index is not None else 0)
+    
+    def _replay_wal(self, metadata_only: bool = False):
+        replayed = 0
+        
+        next_id = self.index.ntotal
+        
+        for start_id, embeddings, metadata in self.wal.replay():
+            skip = next_id - start_id
+            if skip >= len(embeddings):
+                continue
+            
+            skip = max(skip, 0)
+            self.metadata_store.add(start_id + skip, metadata[skip:], replace=False)
+            replayed += len(embeddings) - skip
+            next_id = start_id + len(embeddings)
+            if not metadata_only:
+                self._add_to_delta(embeddings[skip:])
+        
+        if not metadata_only:
+            self.metadata_store.truncate(next_id)
+        self.wal.pending_vectors = replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} vectors from the write-ahead log")
+    
+    def _new_delta_index(self) -> faiss.Index:
+        if not self.index.is_trained:
+            return build_faiss_index(self.dimension, "flat")
+        if faiss.try_extract_index_ivf(self.index) is None:
+            return build_faiss_index(self.dimension, describe_index(self.index)["index_type"])
+        
+        if not self._base_writable and os.path.exists(self._path("faiss_trained.bin")):
+            return faiss.read_index(self._path("faiss_trained.bin"))
+        
+        template = self.index if self._base_writable else faiss.read_index(self._path("faiss_index.bin"))
+        delta = faiss.clone_index(template)
+        delta.reset()
+        return delta
+    
+    def _add_to_delta(self, embeddings: np.ndarray):
+        if self.delta_index is None:
+            self.delta_index = self._new_delta_index()
+        self.delta_index.add(embeddings)
     
-    def _save_local_index(self):
-        faiss.write_index(self.index, "faiss_index.bin")
-        with open("metadata.pkl", "wb") as f:
-            pickle.dump(self.metadata, f)
+    def checkpoint(self):
+        with self._write_lock:
+            if not self.index.is_trained:
+                return
+            
+            if self._base_writable:
+                # Searches read base and delta together, so the merge and clearing the delta happen in one step.
+                with self._index_lock:
+                    self._merge_wal(self.index)
+                    self.delta_index = None
+                self._save_local_index()
+                self.wal.reset()
+                return
+            
+            base = faiss.read_index(self._path("faiss_index.bin"))
+            self._merge_wal(base)
+            self._save_local_index(base)
+            self.wal.reset()
+            
+            merged = self._read_base_index()
+            with self._index_lock:
+                self.index = merged
+                self.delta_index = None
+    
+    def _merge_wal(self, base: faiss.Index):
+        for start_id, embeddings, _ in self.wal.replay():
+            skip = max(base.ntotal - start_id, 0)
+            if skip < len(embeddings):
+                base.add(embeddings[skip:])
+    
+    def _save_local_index(self, index: Optional[faiss.Index] = None):
+        index = index or self.index
+        atomic_write_index(self._path("faiss_index.bin"), index)
+        atomic_write_json(self._path("index_meta.json"), self._index_info())
+        
+        if faiss.try_extract_index_ivf(index) is not None:
+            template = faiss.clone_index(index)
+            template.reset()
+            atomic_write_index(self._path("faiss_trained.bin"), template)
+    
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.encode(texts)
+    
+    def reembed(self, batch_size: int = 256):
+        self.index = build_faiss_index(self.dimension)
+        self.delta_index = None
+        self._base_writable = True
+        
+        embeddings = [
+            self.embed([meta.get("content", "") for _, meta in batch])
+            for batch in self.metadata_store.iter_documents(batch_size)
+        ]
+        
+        embeddings = np.vstack(embeddings) if embeddings else np.zeros((0, self.dimension), dtype="float32")
+        buffered = not self.index.is_trained and len(embeddings) < training_threshold(self.index)
+        if not buffered and len(embeddings):
+            train_index(self.index, embeddings)
+            self.index.add(embeddings)
+        
+        self._save_local_index()
+        self.wal.reset()
+        
+        if buffered and len(embeddings):
+            metadata = [meta for batch in self.metadata_store.iter_documents(batch_size) for _, meta in batch]
+            self.wal.append(0, embeddings, metadata)
+            self._add_to_delta(embeddings)
+    
+    def train_index(self, documents: List[str]):
+        with self._write_lock:
+            train_index(self.index, self.embed(documents))
+            self.checkpoint()
+    
+    def get_index_info(self) -> Dict[str, Any]:
+        if self.use_pinecone:
+            return {
+                "index_type": "pinecone",
+                "dimension": self.dimension,
+                "namespaces": sorted(self._pinecone_namespaces()),
+                "upserts": self.upserter.get_stats()
+            }
+        return {
+            **describe_index(self.index),
+            "ntotal": self._vector_count(),
+            "pending_wal_vectors": self.wal.pending_vectors,
+            "dimension": self.dimension
+        }
     
     def add_documents(self, documents: List[str], metadata: List[Dict[str, Any]]):
-        embeddings = self.embedder.encode(documents)
+        if not settings.chunking_enabled:
+            self._add_passages(documents, [
+                {**meta, "content": meta.get("content", document)}
+                for document, meta in zip(documents, metadata)
+            ])
+            return
+        
+        parents: List[Tuple[str, Dict[str, Any]]] = []
+        chunks = iter_chunks(
+            documents,
+            metadata,
+            parents,
+            inline_parent=self.use_pinecone,
+            max_tokens=self._chunk_max_tokens(),
+            count=self.embedder.count_tokens
+        )
+        
+        for batch in batched(chunks, settings.chunk_batch_size):
+            self._add_passages([text for text, _ in batch], [meta for _, meta in batch])
+            self._store_parents(parents)
+        self._store_parents(parents)
+    
+    def _chunk_max_tokens(self) -> int:
+        limit = self.embedder.max_input_tokens()
+        if limit is not None and settings.chunk_max_tokens > limit:
+            logger.warning(
+                f"CHUNK_MAX_TOKENS={settings.chunk_max_tokens} exceeds what {self.model_name} embeds; using {limit}"
+            )
+            return limit
+        return settings.chunk_max_tokens
+    
+    def _store_parents(self, parents: List[Tuple[str, Dict[str, Any]]]):
+        if parents and not self.use_pinecone:
+            self.metadata_store.add_parents(parents)
+        parents.clear()
+    
+    def _add_passages(self, documents: List[str], metadata: List[Dict[str, Any]]):
+        embeddings = self.embed(documents)
         
         if self.use_pinecone:
-            vectors = [
-                (str(i), embedding.tolist(), meta) 
-                for i, (embedding, meta) in enumerate(zip(embeddings, metadata))
-            ]
-            self.index.upsert(vectors)
+            vectors_by_namespace: Dict[str, List[Tuple[str, List[float], Dict[str, Any]]]] = {}
+            for document, embedding, meta in zip(documents, embeddings, metadata):
+                namespace = self._namespace(meta.get("jurisdiction"))
+                vector_id = (
+                    f"{meta['parent_id']}:{meta['chunk_index']}" if "parent_id" in meta
+                    else document_id(document, meta)
+                )
+                vectors_by_namespace.setdefault(namespace, []).append(
+                    (vector_id, embedding.tolist(), self._pinecone_metadata(meta))
+                )
+            self.upserter.upsert(vectors_by_namespace)
+            with self._namespace_lock:
+                self._namespaces.update(vectors_by_namespace)
         else:
-            self.index.add(embeddings)
-            self.metadata.extend(metadata)
-            self._save_local_index()
+            embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+            if embeddings.ndim != 2 or embeddings.shape != (len(metadata), self.dimension):
+                raise ValueError(
+                    f"Expected {len(metadata)} embeddings of dimension {self.dimension}, got shape {embeddings.shape}"
+                )
+            
+            with self._write_lock:
+                start_id = self._vector_count()
+                wal_size = self.wal.size()
+                self.wal.append(start_id, embeddings, metadata)
+                try:
+                    self.metadata_store.add(start_id, metadata)
+                    with self._index_lock:
+                        self._add_to_delta(embeddings)
+                except BaseException:
+                    self.metadata_store.truncate(start_id)
+                    self.wal.rollback(wal_size, len(embeddings))
+                    raise
+                
+                if not self.index.is_trained and self._vector_count() >= training_threshold(self.index):
+                    self._train_buffered()
+                elif self.wal.pending_vectors >= settings.wal_checkpoint_vectors:
+                    self.checkpoint()
     
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        query_embedding = self.embedder.encode([query])
+    def _train_buffered(self):
+        # Until the base is trained, vectors wait in an exact delta segment and in the WAL.
+        index = build_faiss_index(self.dimension)
+        try:
+            train_index(index, self.delta_index.reconstruct_n(0, self.delta_index.ntotal))
+        except Exception as e:
+            logger.error(f"Training the index on {self.delta_index.ntotal} buffered vectors failed: {str(e)}")
+            return
         
+        logger.info(f"Trained the index on {self.delta_index.ntotal} buffered vectors")
+        with self._index_lock:
+            self.index = index
+            self._base_writable = True
+        self.checkpoint()
+    
+    def search(self, query: str, k: int = 5, nprobe: Optional[int] = None, ef_search: Optional[int] = None, hybrid: Optional[bool] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return self._search(query, self.embed([query]), k, nprobe, ef_search, hybrid, filters)
+    
+    async def asearch(self, query: str, k: int = 5, nprobe: Optional[int] = None, ef_search: Optional[int] = None, hybrid: Optional[bool] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        query_embedding = await self.embedder.aencode([query])
+        return await asyncio.to_thread(self._search, query, query_embedding, k, nprobe, ef_search, hybrid, filters)
+    
+    def _search(self, query: str, query_embedding: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int], hybrid: Optional[bool], filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        hybrid = settings.hybrid_search if hybrid is None else hybrid
+        start_time = time.perf_counter()
+        candidates = k * settings.chunk_search_multiplier if settings.chunking_enabled else k
+        
+        while True:
+            if self.use_pinecone or not hybrid:
+                results = self.search_by_vector(query_embedding, candidates, nprobe, ef_search, filters)
+            else:
+                results = self.hybrid_search(query, query_embedding, candidates, nprobe, ef_search, filters)
+            
+            if not settings.chunking_enabled:
+                break
+            
+            parent_ids = [r["metadata"]["parent_id"] for r in results if "parent_id" in (r.get("metadata") or {})]
+            parents = self.metadata_store.get_parents(parent_ids) if parent_ids and not self.use_pinecone else {}
+            collapsed = collapse_hits(results, k, parents)
+            if len(collapsed) >= k or len(results) < candidates or candidates >= settings.chunk_search_max_candidates:
+                results = collapsed
+                break
+            candidates = min(candidates * 2, settings.chunk_search_max_candidates)
+        
+        mode = "pinecone" if self.use_pinecone else "hybrid" if hybrid else "dense"
+        record_vector_search(f"{mode}_filtered" if filters else mode, time.perf_counter() - start_time)
+        return results
+    
+    def hybrid_search(self, query: str, query_embedding: np.ndarray, k: int = 5, nprobe: Optional[int] = None, ef_search: Optional[int] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        candidates = max(k, settings.hybrid_candidates)
+        dense_hits = self._dense_hits(query_embedding, candidates, nprobe, ef_search, filters)
+        lexical_hits = self.metadata_store.lexical_search(query, candidates, **(filters or {}))
+        
+        dense_scores = dict(dense_hits)
+        lexical_scores = dict(lexical_hits)
+        fused = reciprocal_rank_fusion(
+            [[idx for idx, _ in dense_hits], [idx for idx, _ in lexical_hits]],
+            settings.rrf_k
+        )[:k]
+        
+        rows = self.metadata_store.get_many([idx for idx, _ in fused])
+        return [
+            {
+                "content": rows[idx].get("content", ""),
+                "score": score,
+                "dense_score": dense_scores.get(idx),
+                "lexical_score": lexical_scores.get(idx),
+                "metadata": rows[idx]
+            }
+            for idx, score in fused if idx in rows
+        ]
+    
+    def search_by_vector(self, query_embedding: np.ndarray, k: int = 5, nprobe: Optional[int] = None, ef_search: Optional[int] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         if self.use_pinecone:
-            results = self.index.query(
-                vector=query_embedding[0].tolist(),
-                top_k=k,
-                include_metadata=True
-            )
-            return [
-                {
-                    "content": match.metadata.get("content", ""),
-                    "score": match.score,
-                    "metadata": match.metadata
-                }
-                for match in results.matches
-            ]
+            return self._pinecone_query(query_embedding, k, filters)
         else:
-            scores, indices = self.index.search(query_embedding, k)
+            hits = self._dense_hits(query_embedding, k, nprobe, ef_search, filters)
+            rows = self.metadata_store.get_many([idx for idx, _ in hits])
             return [
                 {
-                    "content": self.metadata[idx].get("content", ""),
-                    "score": float(scores[0][i]),
-                    "metadata": self.metadata[idx]
+                    "content": rows[idx].get("content", ""),
+                    "score": score,
+                    "metadata": rows[idx]
                 }
-                for i, idx in enumerate(indices[0]) if idx < len(self.metadata)
+                for idx, score in hits if idx in rows
             ]
+    
+    def _dense_hits(self, query_embedding: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int], filters: Optional[Dict[str, Any]]) -> List[Tuple[int, float]]:
+        if not filters:
+            return self._search_segments(query_embedding, k, nprobe, ef_search)
+        
+        ids = self.metadata_store.filter_ids(limit=settings.filter_candidate_max + 1, **filters)
+        if len(ids) <= settings.filter_candidate_max:
+            if not ids:
+                return []
+            return self._search_segments(query_embedding, k, nprobe, ef_search, np.asarray(ids, dtype="int64"))
+        
+        # Too many matches to build a selector over: search unfiltered and keep the hits that match,
+        # widening the search until k of them do.
+        total = self._vector_count()
+        fetch = k * settings.filter_overfetch
+        while True:
+            fetch = min(fetch, total, max(settings.filter_post_search_max, k))
+            hits = self._search_segments(query_embedding, fetch, nprobe, ef_search)
+            allowed = set(self.metadata_store.match_ids([idx for idx, _ in hits], **filters))
+            matched = [hit for hit in hits if hit[0] in allowed]
+            if len(matched) >= k or fetch >= total or fetch >= settings.filter_post_search_max:
+                return matched[:k]
+            fetch *= max(2, settings.filter_overfetch)
+    
+    def _pinecone_metadata(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        meta = clean_metadata(meta)
+        for key in ("jurisdiction", "court"):
+            value = normalize_value(meta.get(key))
+            if value is not None:
+                meta = {**meta, f"{key}_key": value}
+        date_number = _date_number(document_date(meta))
+        if date_number is not None:
+            meta = {**meta, "date_number": date_number}
+        return fit_metadata(meta)
+    
+    def _namespace(self, jurisdiction: Optional[str]) -> str:
+        if not settings.pinecone_namespace_by_jurisdiction:
+            return ""
+        return namespace_for(jurisdiction)
+    
+    def _pinecone_namespaces(self) -> set:
+        if not settings.pinecone_namespace_by_jurisdiction:
+            return {""}
+        
+        with self._namespace_lock:
+            stale = (
+                self._namespaces_checked is None
+                or time.monotonic() - self._namespaces_checked > settings.pinecone_namespace_refresh
+            )
+        if stale:
+            namespaces = set(self.index.describe_index_stats().namespaces)
+            with self._namespace_lock:
+                self._namespaces |= namespaces
+                self._namespaces_checked = time.monotonic()
+        
+        with self._namespace_lock:
+            return set(self._namespaces) or {DEFAULT_NAMESPACE}
+    
+    def _pinecone_query(self, query_embedding: np.ndarray, k: int, filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        jurisdiction = (filters or {}).get("jurisdiction")
+        if jurisdiction and settings.pinecone_namespace_by_jurisdiction:
+            namespaces = [self._namespace(jurisdiction)]
+        else:
+            namespaces = sorted(self._pinecone_namespaces())
+        
+        def query(namespace: str):
+            return self.index.query(
+                vector=query_embedding[0].tolist(),
+                top_k=k,
+                include_metadata=True,
+                filter=self._pinecone_filter(filters),
+                namespace=namespace
+            ).matches
+        
+        if len(namespaces) == 1:
+            matches = query(namespaces[0])
+        else:
+            matches = [match for result in self._query_executor.map(query, namespaces) for match in result]
+        
+        matches = sorted(matches, key=lambda match: match.score, reverse=True)[:k]
+        return [
+            {
+                "content": match.metadata.get("content", ""),
+                "score": match.score,
+                "metadata": match.metadata
+            }
+            for match in matches
+        ]
+    
+    def _pinecone_filter(self, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not filters:
+            return None
+        
+        clauses = {}
+        for key in ("jurisdiction", "court"):
+            value = normalize_value(filters.get(key))
+            # Queries are already routed to the jurisdiction's namespace.
+            if value is None or (key == "jurisdiction" and settings.pinecone_namespace_by_jurisdiction):
+                continue
+            clauses[f"{key}_key"] = {"$eq": value}
+        
+        date_range = {}
+        for key, operator in (("date_from", "$gte"), ("date_to", "$lte")):
+            value = _date_number(filters.get(key))
+            if value is not None:
+                date_range[operator] = value
+        if date_range:
+            clauses["date_number"] = date_range
+        
+        return clauses or None
+    
+    def _search_segments(self, query_embedding: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int], ids: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        with self._index_lock:
+            hits = self._search_locked((self.index, self.delta_index), query_embedding, k, nprobe, ef_search, ids)
+        
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:k]
+    
+    def _search_locked(self, segments: Tuple[Optional[faiss.Index], ...], query_embedding: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int], ids: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        hits = []
+        offset = 0
+        
+        for segment in segments:
+            if segment is None:
+                continue
+            
+            local_ids = None
+            if ids is not None:
+                local_ids = ids[(ids >= offset) & (ids < offset + segment.ntotal)] - offset
+            
+            if segment.ntotal > 0 and (local_ids is None or len(local_ids) > 0):
+                if local_ids is None:
+                    scores, indices = segment.search(query_embedding, k, params=search_parameters(segment, nprobe, ef_search))
+                else:
+                    scores, indices = self._search_subset(segment, query_embedding, k, nprobe, ef_search, local_ids)
+                hits.extend(
+                    (int(idx) + offset, float(score))
+                    for score, idx in zip(scores[0], indices[0]) if idx >= 0
+                )
+            offset += segment.ntotal
+        
+        return hits
+    
+    def _search_subset(self, segment: faiss.Index, query_embedding: np.ndarray, k: int, nprobe: Optional[int], ef_search: Optional[int], local_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if len(local_ids) <= settings.filter_exact_search_max and faiss.try_extract_index_ivf(segment) is None:
+            vectors = segment.reconstruct_batch(local_ids)
+            scores = vectors @ query_embedding[0]
+            order = np.argsort(-scores)[:k]
+            return scores[order][None, :], local_ids[order][None, :]
+        
+        local_ids = np.ascontiguousarray(local_ids, dtype="int64")
+        selector = faiss.IDSelectorBatch(len(local_ids), faiss.swig_ptr(local_ids))
+        params = search_parameters(segment, nprobe, ef_search, selector)
+        return segment.search(query_embedding, k, params=params)
+
+def _create_vector_store() -> VectorStore:
+    if settings.vector_store_backend == "pinecone":
+        return VectorStore(use_pinecone=True)
+    if settings.vector_store_backend == "pinecone_memory":
+        return VectorStore(
+            use_pinecone=True,
+            pinecone_index=InMemoryPineconeIndex(embedding_service.resolve().dimension)
+        )
+    return VectorStore()
 
-vector_store = VectorStore() 
\ No newline at end of file
+vector_store = LazyComponent("vector_store", _create_vector_store) 
\ No newline at end of file
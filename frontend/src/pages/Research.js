@@ -163,24 +163,81 @@ const ListItem = styled.li`
   margin-bottom: 0.5rem;
 `;
 
+const STAGE_LABELS = {
+  started: 'Searching legal databases...',
+  retrieval: 'Analyzing findings...',
+  analysis: 'Summarizing research...',
+  summary: 'Composing legal brief...',
+  legal_analysis: 'Composing legal brief...',
+  token: 'Formatting legal brief...',
+};
+
+const applyEvent = (state, event) => {
+  switch (event.event) {
+    case 'retrieval':
+      return { ...state, findings: event.data };
+    case 'analysis':
+      return { ...state, analysis: event.data };
+    case 'summary':
+      return { ...state, summary: event.data };
+    case 'legal_analysis':
+      return { ...state, legalAnalysis: event.data };
+    case 'token':
+      return { ...state, formattedBrief: (state.formattedBrief || '') + event.data };
+    case 'composition':
+      return { ...state, brief: event.data.brief, formattedBrief: event.data.formatted_brief };
+    case 'done':
+      return { ...state, done: true };
+    case 'error':
+      return { ...state, error: event.data.error };
+    default:
+      return state;
+  }
+};
+
 function Research() {
   const [result, setResult] = useState(null);
+  const [stage, setStage] = useState(null);
   const { register, handleSubmit, reset } = useForm();
 
-  const researchMutation = useMutation(legalApi.research, {
-    onSuccess: (data) => {
-      setResult(data);
-      toast.success('Research completed successfully!');
+  const researchMutation = useMutation(
+    (query) => {
+      let state = {};
+      return legalApi.researchStream(query, (event) => {
+        state = applyEvent(state, event);
+        setStage(event.event);
+        setResult(state);
+      }).then(() => state);
     },
-    onError: (error) => {
-      toast.error(error.response?.data?.detail || 'Research failed');
+    {
+      onMutate: () => {
+        setResult({});
+        setStage(null);
+      },
+      onSuccess: (state) => {
+        if (state.error) {
+          toast.error(state.error);
+        } else {
+          toast.success('Research completed successfully!');
+        }
+      },
+      onError: (error) => {
+        setResult((state) => ({ ...state, error: error.message }));
+        toast.error(error.message || 'Research failed');
+      }
     }
-  });
+  );
 
   const onSubmit = (data) => {
     researchMutation.mutate(data);
   };
 
+  const summary = result?.brief || result?.summary;
+  const legalAnalysis = result?.brief?.legal_analysis || result?.legalAnalysis;
+  const supportingCases = result?.brief?.supporting_cases
+    || (result?.findings || []).flatMap((finding) => finding.citations);
+  const hasContent = result && (result.findings || summary || legalAnalysis);
+
   return (
     <Container>
       <SearchPanel>
@@ -225,69 +282,107 @@ function Research() {
           Research Results
         </Title>
         
-        {researchMutation.isLoading && (
+        {researchMutation.isLoading && !hasContent && (
           <LoadingState>
             <Clock size={48} style={{ marginBottom: '1rem' }} />
             <p>AI agents are working on your research...</p>
             <p style={{ fontSize: '0.9rem', marginTop: '0.5rem', opacity: 0.8 }}>
-              This may take 30-60 seconds
+              {STAGE_LABELS[stage] || 'Starting research...'}
             </p>
           </LoadingState>
         )}
 
-        {result && result.success && (
+        {hasContent && (
           <BriefContainer>
-            <Section>
-              <SectionTitle>
-                <CheckCircle size={20} />
-                Executive Summary
-              </SectionTitle>
-              <Text>{result.data.brief.executive_summary}</Text>
-            </Section>
-
-            <Section>
-              <SectionTitle>Key Findings</SectionTitle>
-              <List>
-                {result.data.brief.key_findings.map((finding, index) => (
-                  <ListItem key={index}>{finding}</ListItem>
-                ))}
-              </List>
-            </Section>
-
-            <Section>
-              <SectionTitle>Legal Analysis</SectionTitle>
-              <Text style={{ whiteSpace: 'pre-line' }}>
-                {result.data.brief.legal_analysis}
-              </Text>
-            </Section>
-
-            <Section>
-              <SectionTitle>Conclusions</SectionTitle>
-              <List>
-                {result.data.brief.conclusions.map((conclusion, index) => (
-                  <ListItem key={index}>{conclusion}</ListItem>
-                ))}
-              </List>
-            </Section>
-
-            <Section>
-              <SectionTitle>Supporting Cases</SectionTitle>
-              <List>
-                {result.data.brief.supporting_cases.slice(0, 5).map((citation, index) => (
-                  <ListItem key={index}>
-                    <strong>{citation.case_name}</strong> - {citation.citation} ({citation.court}, {format(new Date(citation.date), 'yyyy')})
-                  </ListItem>
-                ))}
-              </List>
-            </Section>
-
-            <div style={{ fontSize: '0.9rem', opacity: 0.8, marginTop: '2rem' }}>
-              Generated on {format(new Date(result.data.brief.generated_at), 'PPpp')}
-            </div>
+            {researchMutation.isLoading && (
+              <div style={{ fontSize: '0.9rem', opacity: 0.8, marginBottom: '1rem' }}>
+                <Clock size={16} /> {STAGE_LABELS[stage] || 'Finishing up...'}
+              </div>
+            )}
+
+            {summary && (
+              <Section>
+                <SectionTitle>
+                  <CheckCircle size={20} />
+                  Executive Summary
+                </SectionTitle>
+                <Text>{summary.executive_summary}</Text>
+              </Section>
+            )}
+
+            {summary && (
+              <Section>
+                <SectionTitle>Key Findings</SectionTitle>
+                <List>
+                  {summary.key_findings.map((finding, index) => (
+                    <ListItem key={index}>{finding}</ListItem>
+                  ))}
+                </List>
+              </Section>
+            )}
+
+            {!summary && result.analysis && (
+              <Section>
+                <SectionTitle>Key Patterns</SectionTitle>
+                <List>
+                  {result.analysis.key_patterns.map((pattern, index) => (
+                    <ListItem key={index}>{pattern}</ListItem>
+                  ))}
+                </List>
+              </Section>
+            )}
+
+            {legalAnalysis && (
+              <Section>
+                <SectionTitle>Legal Analysis</SectionTitle>
+                <Text style={{ whiteSpace: 'pre-line' }}>
+                  {legalAnalysis}
+                </Text>
+              </Section>
+            )}
+
+            {summary && (
+              <Section>
+                <SectionTitle>Conclusions</SectionTitle>
+                <List>
+                  {summary.conclusions.map((conclusion, index) => (
+                    <ListItem key={index}>{conclusion}</ListItem>
+                  ))}
+                </List>
+              </Section>
+            )}
+
+            {supportingCases.length > 0 && (
+              <Section>
+                <SectionTitle>Supporting Cases</SectionTitle>
+                <List>
+                  {supportingCases.slice(0, 5).map((citation, index) => (
+                    <ListItem key={index}>
+                      <strong>{citation.case_name}</strong> - {citation.citation} ({citation.court}, {format(new Date(citation.date), 'yyyy')})
+                    </ListItem>
+                  ))}
+                </List>
+              </Section>
+            )}
+
+            {result.formattedBrief && (
+              <Section>
+                <SectionTitle>Formatted Brief</SectionTitle>
+                <Text style={{ whiteSpace: 'pre-line' }}>
+                  {result.formattedBrief}
+                </Text>
+              </Section>
+            )}
+
+            {result.brief && (
+              <div style={{ fontSize: '0.9rem', opacity: 0.8, marginTop: '2rem' }}>
+                Generated on {format(new Date(result.brief.generated_at), 'PPpp')}
+              </div>
+            )}
           </BriefContainer>
         )}
 
-        {result && !result.success && (
+        {result && result.error && !researchMutation.isLoading && (
           <div style={{ color: '#ff6b6b', textAlign: 'center', padding: '2rem' }}>
             <AlertCircle size={48} style={{ marginBottom: '1rem' }} />
             <p>Research failed: {result.error}</p>
@@ -304,4 +399,4 @@ function Research() {
   );
 }
 
-export default Research; 
\ No newline at end of file
+export default Research;
@@ -15,6 +15,38 @@ export const legalApi = {
     return response.data;
   },
 
+  researchStream: async (query, onEvent) => {
+    const response = await fetch(`${API_BASE_URL}/research/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(query),
+    });
+
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || 'Research failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+
+      lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+    }
+
+    if (buffer.trim()) {
+      onEvent(JSON.parse(buffer));
+    }
+  },
+
   validateQuery: async (query) => {
     const response = await api.post('/validate-query', query);
     return response.data;